@@ -0,0 +1,131 @@
+import argparse
+import json
+import random
+import sys
+import time
+
+import pandas as pd
+
+from fetch_metadata import enrich_with_metadata
+from mock_spotify import FaultConfig, make_fixtures, start_in_thread
+from telemetry import Telemetry
+from utils import get_offline_client, make_pooled_session
+
+# Escenarios por defecto: sin fallos, ráfagas de 429 con Retry-After y errores 5xx
+SCENARIOS = {
+    "clean":     dict(),
+    "throttled": dict(burst_every=40, burst_len=2, retry_after=1),
+    "flaky":     dict(error_rate=0.05),
+}
+
+
+def make_chart(fixtures: dict, n_rows: int, seed: int = 0,
+               by_name_frac: float = 0.2, unknown_frac: float = 0.1) -> tuple[pd.DataFrame, dict]:
+    """
+    Chart sintético sobre el catálogo del mock: la mayoría de filas con track_id,
+    una parte sólo con (track_name, artist_name) y otra con canciones inexistentes.
+    Devuelve (chart, filas esperadas por track_id).
+    """
+    rng = random.Random(seed)
+    tracks = list(fixtures["tracks"].values())
+    rows, expected = [], {}
+    for i in range(n_rows):
+        r = rng.random()
+        if r < unknown_frac:
+            rows.append({"track_id": None, "track_name": f"Missing {i}", "artist_name": "Nobody", "streams_chart": 1000})
+            continue
+        t = rng.choice(tracks)
+        a = fixtures["artists"][t["artists"][0]["id"]]
+        by_name = r < unknown_frac + by_name_frac
+        rows.append({
+            "track_id": None if by_name else t["id"],
+            "track_name": t["name"],
+            "artist_name": t["artists"][0]["name"],
+            "streams_chart": rng.randint(10_000, 1_000_000),
+        })
+        expected[t["id"]] = {
+            "artist_id": a["id"],
+            "track_popularity": t["popularity"],
+            "artist_popularity": a["popularity"],
+            "artist_genres": "; ".join(a["genres"]),
+        }
+    return pd.DataFrame(rows), expected
+
+
+def check_output(df: pd.DataFrame, chart: pd.DataFrame, expected: dict) -> dict:
+    n_resolvable = int((~chart["track_name"].str.startswith("Missing")).sum())
+    wrong = 0
+    for row in df.to_dict(orient="records"):
+        exp = expected.get(row["track_id"])
+        if exp is None or any(row.get(k) != v for k, v in exp.items()):
+            wrong += 1
+    return {
+        "rows_expected": n_resolvable,
+        "rows_out": int(len(df)),
+        "rows_wrong": wrong,
+        "correct_frac": round((len(df) - wrong) / n_resolvable, 4) if n_resolvable else 1.0,
+    }
+
+
+def run_scenario(name: str, faults: dict, fixtures: dict, chart: pd.DataFrame, expected: dict, latency_ms: float) -> dict:
+    server, base = start_in_thread(fixtures, FaultConfig(latency_ms=latency_ms, **faults))
+    try:
+        telemetry = Telemetry(scenario=name)
+        sp = telemetry.wrap(get_offline_client(base, requests_session=make_pooled_session(telemetry=telemetry)))
+        t0 = time.perf_counter()
+        df = enrich_with_metadata(sp, chart.copy(), country="Benchland", date="2017-08-01", pause=0, telemetry=telemetry)
+        elapsed = time.perf_counter() - t0
+        stats = server.stats.as_dict()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    res = {
+        "scenario": name,
+        "seconds": round(elapsed, 3),
+        "rows_per_s": round(len(chart) / elapsed, 1),
+        "api_calls": sum(stats["calls"].values()),
+        "throttled": stats["throttled"],
+        "server_errors": stats["server_errors"],
+        "calls": stats["calls"],
+        "telemetry": telemetry.summary(),
+    }
+    res.update(check_output(df, chart, expected))
+    return res
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline benchmark of the metadata stage against mock_spotify.py.")
+    ap.add_argument("--rows", type=int, default=100, help="Chart rows per scenario")
+    ap.add_argument("--latency-ms", type=float, default=2.0, help="Simulated API latency per request")
+    ap.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="Scenario(s) to run (default: all)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--min-correct", type=float, default=1.0, help="Exit with error if correctness falls below this")
+    ap.add_argument("--out", help="Optional JSON file to store the results")
+    args = ap.parse_args()
+
+    fixtures = make_fixtures(n_tracks=max(50, args.rows * 2), n_artists=max(20, args.rows // 2), seed=args.seed)
+    chart, expected = make_chart(fixtures, args.rows, seed=args.seed)
+
+    results = []
+    for name in args.scenario or list(SCENARIOS):
+        print(f"\n--- Scenario: {name} ---")
+        res = run_scenario(name, SCENARIOS[name], fixtures, chart, expected, args.latency_ms)
+        results.append(res)
+        print(f"📊 {res['rows_per_s']} rows/s, {res['api_calls']} calls "
+              f"({res['throttled']}× 429, {res['server_errors']}× 5xx), "
+              f"correct {res['correct_frac']:.0%} ({res['rows_out']}/{res['rows_expected']})")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Saved results to {args.out}")
+
+    bad = [r["scenario"] for r in results if r["correct_frac"] < args.min_correct]
+    if bad:
+        print(f"❌ Correctness below {args.min_correct:.0%} in: {', '.join(bad)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
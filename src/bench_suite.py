@@ -0,0 +1,302 @@
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import runpy
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from profiling import git_commit, peak_rss_mb
+from synthetic_data import GENERATOR_VERSION, write_tree
+
+DATA_DIR     = "data/benchmarks/synthetic"
+RESULTS_PATH = "data/benchmarks/results.jsonl"
+
+# Escalas de los datos sintéticos (large ≈ 3M filas de charts y 1M de audio features).
+# file_rows crece con la escala para que summarize_file y las figuras no midan siempre
+# ficheros del mismo tamaño.
+SCALES = {
+    "small":  dict(n_tracks=50_000, n_regions=20, n_days=30, top=200, meta_rows=5_000,
+                   n_files=32, file_rows=50, n_countries=16),
+    "medium": dict(n_tracks=200_000, n_regions=50, n_days=100, top=200, meta_rows=20_000,
+                   n_files=200, file_rows=200, n_countries=40),
+    "large":  dict(n_tracks=1_000_000, n_regions=54, n_days=280, top=200, meta_rows=100_000,
+                   n_files=1000, file_rows=1000, n_countries=120),
+}
+
+SRC = Path(__file__).resolve().parent
+
+
+# ---------- Casos: cada uno prepara sus entradas y devuelve (función a cronometrar, filas, unidad) ----------
+
+def case_pick_sample(m: dict):
+    import pandas as pd
+    from select_from_charts import pick_sample
+    charts = pd.read_csv(m["paths"]["charts"])
+    return lambda: pick_sample(charts, m["pick"]["country"], m["pick"]["date"], 50), len(charts), "rows"
+
+
+def case_merge(m: dict):
+    from process_data import merge_and_compute_mood
+    p = m["paths"]
+    return lambda: merge_and_compute_mood(p["metadata"], p["features"]), m["rows"]["metadata"] + m["rows"]["features"], "rows"
+
+
+def case_merge_dataset(m: dict):
+    # camino de producción: un merge en lote de los metadatos por país/día escrito en el dataset Parquet
+    import shutil
+    import mood_dataset
+    from process_data import merge_and_compute_mood, meta_partitions
+    out = "data/processed/mood_dataset_bench"
+    shutil.rmtree(out, ignore_errors=True)
+    metas, features = m["meta_files"], m["paths"]["features"]
+
+    def run():
+        df = merge_and_compute_mood(metas, features)
+        mood_dataset.write(df, out, partitions=meta_partitions(metas))
+    return run, m["rows"]["meta_files"] + m["rows"]["features"], "rows"
+
+
+def case_summarize_dataset(m: dict):
+    from summarize import summarize_dataset
+    return lambda: summarize_dataset(m["paths"]["dataset"]), m["rows"]["dataset"], "rows"
+
+
+def case_summarize_file(m: dict):
+    from summarize import summarize_file
+    files = sorted(glob.glob("data/processed/*_mood_*.csv"))
+    return lambda: [summarize_file(f) for f in files], len(files), "files"
+
+
+def _script(name: str, *argv: str):
+    """Ejecuta src/<name>.py como `python src/<name>.py argv...` (figuras)."""
+    import matplotlib.pyplot as plt  # importar fuera del tiempo medido
+    Path("figures").mkdir(exist_ok=True)
+
+    def run():
+        sys.argv = [name + ".py", *argv]
+        try:
+            runpy.run_path(str(SRC / f"{name}.py"), run_name="__main__")
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                raise
+        plt.close("all")
+    return run
+
+
+def case_visualize(m: dict):
+    p = m["paths"]["processed_a"]
+    return _script("visualize", "--input", p, "--outdir", "figures"), _count(p), "rows"
+
+
+def case_visualize_compare(m: dict):
+    p = m["paths"]
+    return (_script("visualize_compare", "--a", p["processed_a"], "--b", p["processed_b"], "--outdir", "figures"),
+            _count(p["processed_a"]) + _count(p["processed_b"]), "rows")
+
+
+def case_visualize_countries(m: dict):
+    # --summary no es el de por defecto, así que se mide el camino CSV (el cubo se mide aparte con mood_cube.py)
+    return (_script("visualize_countries", "--summary", m["paths"]["summary"], "--outdir", "figures"),
+            m["rows"]["summary"], "rows")
+
+
+def case_visualize_seasonal(m: dict):
+    return _script("visualize_seasonal", "--summary", m["paths"]["summary"], "--outdir", "figures"), m["rows"]["summary"], "rows"
+
+
+def _count(path: str) -> int:
+    with open(path, "rb") as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+
+CASES = {
+    "pick_sample": case_pick_sample,
+    "merge_and_compute_mood": case_merge,
+    "merge_dataset": case_merge_dataset,
+    "summarize_file": case_summarize_file,
+    "summarize_dataset": case_summarize_dataset,
+    "visualize": case_visualize,
+    "visualize_compare": case_visualize_compare,
+    "visualize_countries": case_visualize_countries,
+    "visualize_seasonal": case_visualize_seasonal,
+}
+
+
+# ---------- Datos ----------
+
+def ensure_tree(scale: str, data_dir: str = DATA_DIR, seed: int = 0) -> str:
+    """Genera (o reutiliza, si el manifiesto coincide) el árbol sintético de una escala."""
+    root = os.path.join(data_dir, scale)
+    params = dict(SCALES[scale], seed=seed)
+    try:
+        with open(os.path.join(root, "manifest.json"), encoding="utf-8") as f:
+            m = json.load(f)
+        if m["generator_version"] == GENERATOR_VERSION and m["params"] == params:
+            return root
+    except (OSError, ValueError, KeyError):
+        pass
+    print(f"🎲 Generating synthetic data ({scale}) in {root} ...")
+    write_tree(root, **params)
+    return root
+
+
+# ---------- Ejecución ----------
+
+def run_worker(case: str, root: str) -> dict:
+    """
+    Se ejecuta en un subproceso por caso, de modo que el pico de RSS es sólo de ese caso
+    (incluye cargar sus entradas). Sólo se cronometra la función, no la preparación.
+    """
+    os.chdir(root)
+    with open("manifest.json", encoding="utf-8") as f:
+        m = json.load(f)
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        fn, rows, unit = CASES[case](m)
+        setup_s = time.perf_counter() - t0
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        fn()
+        wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+    return {
+        "rows": rows, "unit": unit,
+        "setup_s": round(setup_s, 4),
+        "wall_s": round(wall, 4),
+        "cpu_s": round(cpu, 4),
+        "rows_per_s": round(rows / wall, 1) if wall > 0 else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_case(case: str, root: str, repeat: int = 1) -> dict:
+    """Lanza `repeat` subprocesos; se queda con el menor tiempo y el mayor pico de memoria."""
+    runs = []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), "--worker", case, "--root", root],
+            capture_output=True, text=True, env={**os.environ, "MPLBACKEND": "Agg"},
+        )
+        if proc.returncode != 0:
+            return {"error": (proc.stderr.strip().splitlines() or ["unknown error"])[-1]}
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    best = min(runs, key=lambda r: r["wall_s"])
+    return {**best, "repeat": repeat, "peak_rss_mb": max((r["peak_rss_mb"] or 0) for r in runs) or None}
+
+
+def git_dirty(cwd: str | None = None) -> bool | None:
+    try:
+        out = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                             cwd=cwd, capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return bool(out.strip())
+
+
+def load_results(path: str) -> list[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(current: list[dict], history: list[dict], base: str | None, threshold: float) -> list[str]:
+    """
+    Compara cada (caso, escala) con el último resultado de `base` (prefijo de commit) o,
+    si base es None, del commit anterior más reciente. Devuelve las regresiones.
+    """
+    commit = current[0]["commit"] if current else None
+    if base is None:
+        older = [r for r in history if r.get("commit") and r["commit"] != commit]
+        if not older:
+            print("ℹ️ No results from another commit to compare against.")
+            return []
+        base = older[-1]["commit"]
+    prev = {(r["case"], r["scale"]): r for r in history if (r.get("commit") or "").startswith(base) and "error" not in r}
+
+    print(f"\n{'case':<24}{'scale':<8}{'rows/s':>12}{'Δ':>8}{'peak MB':>10}{'Δ':>8}   (vs {base})")
+    regressions = []
+    for r in current:
+        b = prev.get((r["case"], r["scale"]))
+        if "error" in r or b is None:
+            continue
+        d_tp = r["rows_per_s"] / b["rows_per_s"] - 1 if b.get("rows_per_s") else 0.0
+        d_mem = r["peak_rss_mb"] / b["peak_rss_mb"] - 1 if b.get("peak_rss_mb") and r.get("peak_rss_mb") else 0.0
+        flag = ""
+        if d_tp < -threshold or d_mem > threshold:
+            flag = "  ⚠️"
+            regressions.append(f"{r['case']} ({r['scale']})")
+        print(f"{r['case']:<24}{r['scale']:<8}{r['rows_per_s']:>12,.0f}{d_tp:>+8.0%}{r['peak_rss_mb'] or 0:>10.0f}{d_mem:>+8.0%}{flag}")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark pipeline functions and figure scripts on deterministic synthetic data "
+                                             "(throughput and peak memory), appending results per git commit.")
+    ap.add_argument("--scale", action="append", choices=list(SCALES), help="Scale(s) to run (default: small and medium)")
+    ap.add_argument("--case", action="append", choices=list(CASES), help="Case(s) to run (default: all)")
+    ap.add_argument("--repeat", type=int, default=1, help="Runs per case; the fastest is kept")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--data-dir", default=DATA_DIR, help="Where the synthetic trees are generated (cached between runs)")
+    ap.add_argument("--results", default=RESULTS_PATH, help="Append-only results file (JSON lines)")
+    ap.add_argument("--no-save", action="store_true", help="Do not append to --results")
+    ap.add_argument("--compare", nargs="?", const="", metavar="COMMIT",
+                    help="Compare with the results of COMMIT (default: the latest other commit in --results)")
+    ap.add_argument("--threshold", type=float, default=0.15, help="Relative slowdown / memory growth flagged as regression")
+    ap.add_argument("--fail-on-regression", action="store_true", help="Exit non-zero if --compare finds a regression")
+    ap.add_argument("--worker", choices=list(CASES), help=argparse.SUPPRESS)
+    ap.add_argument("--root", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.root)))
+        return
+
+    meta = {
+        "commit": git_commit(SRC),
+        "dirty": git_dirty(SRC),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "generator_version": GENERATOR_VERSION,
+    }
+    results = []
+    for scale in args.scale or ["small", "medium"]:
+        root = ensure_tree(scale, args.data_dir, args.seed)
+        print(f"\n--- Scale: {scale} ---")
+        for case in args.case or list(CASES):
+            res = {**meta, "case": case, "scale": scale, **run_case(case, root, args.repeat)}
+            results.append(res)
+            if "error" in res:
+                print(f"❌ {case}: {res['error']}")
+            else:
+                print(f"⏱️ {case:<24} {res['wall_s']:>8.3f}s  {res['rows_per_s']:>12,.0f} {res['unit']}/s  "
+                      f"peak {res['peak_rss_mb']} MB")
+
+    history = load_results(args.results)
+    if not args.no_save:
+        Path(args.results).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.results, "a", encoding="utf-8") as f:
+            for r in results:
+                f.write(json.dumps(r) + "\n")
+        print(f"\n💾 Appended {len(results)} results to {args.results}")
+
+    if args.compare is not None:
+        regressions = compare(results, history, args.compare or None, args.threshold)
+        if regressions:
+            print(f"⚠️ Regressions (> {args.threshold:.0%}): {', '.join(regressions)}")
+            if args.fail_on_regression:
+                sys.exit(1)
+
+    if any("error" in r for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
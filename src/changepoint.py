@@ -0,0 +1,155 @@
+import argparse
+import json
+import math
+import os
+from pathlib import Path
+
+import pandas as pd
+
+STATE_PATH  = "data/interim/changepoint_state.json"
+EVENTS_PATH = "data/processed/mood_events.csv"
+DAILY_PATH  = "data/processed/daily_mood.csv"
+
+# Parámetros del CUSUM (sobre residuos estandarizados)
+ALPHA  = 0.1   # suavizado EWMA de la línea base (media y varianza)
+K      = 0.5   # holgura: desviaciones menores de K sigmas no acumulan
+H      = 4.0   # umbral de alarma
+WARMUP = 7     # días para estimar la línea base antes de poder alertar
+MIN_STD = 0.01
+
+
+class CusumDetector:
+    """
+    CUSUM bilateral online por región, con memoria constante: por región sólo se guardan
+    la línea base EWMA (media/varianza), las dos sumas acumuladas y el último día visto.
+
+        det = CusumDetector.load()
+        event = det.update("ES", "2018-01-05", 0.61)   # dict o None
+        det.save()
+    """
+
+    def __init__(self, state: dict | None = None, alpha: float = ALPHA, k: float = K, h: float = H, warmup: int = WARMUP):
+        self.state = state if state is not None else {}
+        self.alpha, self.k, self.h, self.warmup = alpha, k, h, warmup
+
+    @classmethod
+    def load(cls, path: str = STATE_PATH, **kwargs) -> "CusumDetector":
+        state = None
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+        return cls(state, **kwargs)
+
+    def save(self, path: str = STATE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, path)
+
+    def update(self, region: str, date: str, x: float) -> dict | None:
+        """
+        Procesa el valor del día para una región. Devuelve un evento si hay cambio:
+        {region, date, direction, value, baseline, z, cusum}. Días ya vistos se ignoran.
+        """
+        if x is None or (isinstance(x, float) and math.isnan(x)):
+            return None
+        st = self.state.setdefault(region, {"n": 0, "mean": None, "var": 0.0, "s_pos": 0.0, "s_neg": 0.0, "last_date": None})
+        if st["last_date"] is not None and date <= st["last_date"]:
+            return None
+        st["last_date"] = date
+
+        if st["n"] == 0:
+            st.update(n=1, mean=x, var=0.0)
+            return None
+
+        mean, std = st["mean"], max(math.sqrt(st["var"]), MIN_STD)
+        z = (x - mean) / std
+        event = None
+        if st["n"] >= self.warmup:
+            st["s_pos"] = max(0.0, st["s_pos"] + z - self.k)
+            st["s_neg"] = max(0.0, st["s_neg"] - z - self.k)
+            if st["s_pos"] > self.h or st["s_neg"] > self.h:
+                up = st["s_pos"] > self.h
+                event = {
+                    "region": region, "date": date, "direction": "up" if up else "down",
+                    "value": x, "baseline": mean, "z": z, "cusum": st["s_pos"] if up else st["s_neg"],
+                }
+                # re-anclar la línea base al nuevo nivel
+                st.update(mean=x, s_pos=0.0, s_neg=0.0)
+                st["n"] += 1
+                return event
+
+        diff = x - mean
+        st["mean"] = mean + self.alpha * diff
+        st["var"] = (1 - self.alpha) * (st["var"] + self.alpha * diff * diff)
+        st["n"] += 1
+        return event
+
+
+def top_contributors(tracks: pd.DataFrame, baseline: float, direction: str, n: int = 5) -> str:
+    """
+    Canciones que más empujan el mood del día en la dirección del cambio:
+    contribución = streams_i × (mood_i − línea base) / streams totales.
+    """
+    t = tracks.dropna(subset=["mood_index"])
+    w = t["streams_chart"].clip(lower=0).fillna(0)
+    if t.empty or w.sum() <= 0:
+        return ""
+    contrib = w * (t["mood_index"] - baseline) / w.sum()
+    order = contrib.sort_values(ascending=(direction == "down")).index[:n]
+    return "; ".join(
+        f"{t.at[i, 'track_name']} – {t.at[i, 'artist_name']} ({contrib[i]:+.3f})" for i in order
+    )
+
+
+def detect_day(det: CusumDetector, regions: pd.DataFrame, tracks: pd.DataFrame | None = None,
+               metric: str = "w_mean_streams", top: int = 5) -> pd.DataFrame:
+    """
+    Pasa un día (mood por región, y opcionalmente sus filas por canción) por el detector.
+    """
+    events = []
+    for r in regions.itertuples(index=False):
+        ev = det.update(r.region, str(r.date), float(getattr(r, metric)))
+        if ev is None:
+            continue
+        if tracks is not None:
+            ev["top_tracks"] = top_contributors(tracks[tracks["region"] == r.region], ev["baseline"], ev["direction"], top)
+        events.append(ev)
+    return pd.DataFrame(events)
+
+
+def append_events(events: pd.DataFrame, path: str = EVENTS_PATH):
+    if events.empty:
+        return
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    events.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+    for e in events.itertuples(index=False):
+        arrow = "📈" if e.direction == "up" else "📉"
+        print(f"{arrow} Mood shift in {e.region} on {e.date}: {e.baseline:.3f} → {e.value:.3f} (z={e.z:+.1f})")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay the daily mood series through the online CUSUM detector (backfill). "
+                                             "For new days use: ingest_day.py --detect")
+    ap.add_argument("--daily", default=DAILY_PATH, help="Daily mood CSV (from ingest_day.py)")
+    ap.add_argument("--metric", default="w_mean_streams")
+    ap.add_argument("--state", default=STATE_PATH)
+    ap.add_argument("--out", default=EVENTS_PATH)
+    args = ap.parse_args()
+
+    if not os.path.exists(args.daily):
+        print(f"⚠️ Not found: {args.daily}")
+        return
+
+    det = CusumDetector.load(args.state)
+    daily = pd.read_csv(args.daily).sort_values(["date", "region"])
+    frames = [detect_day(det, day, metric=args.metric) for _, day in daily.groupby("date", sort=True)]
+    events = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    append_events(events, args.out)
+    det.save(args.state)
+    print(f"✅ {len(events)} events ({len(det.state)} regions tracked)")
+
+
+if __name__ == "__main__":
+    main()
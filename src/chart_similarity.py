@@ -0,0 +1,202 @@
+import argparse
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+CHARTS_PATH  = "data/raw/worldwide_daily_song_ranking.csv"
+SUMMARY_PATH = "data/processed/country_summary.csv"
+CACHE_DIR    = "data/interim/similarity"
+OUT_DIR      = "data/processed"
+
+TRACK_ID_RE = r"(?:track/|track:)([0-9A-Za-z]{22})"
+
+
+def load_charts(path: str, dates: list[str] | None = None, include_global: bool = False) -> pd.DataFrame:
+    """
+    Carga el ranking diario con columnas normalizadas (region, date, track_id, streams).
+    """
+    df = pd.read_csv(path, usecols=lambda c: c.strip().lower() in {"url", "streams", "date", "region"})
+    df.columns = [c.strip().lower() for c in df.columns]
+    if dates:
+        df = df[df["date"].isin(dates)]
+    if not include_global:
+        df = df[df["region"].str.lower() != "global"]
+    df = df.assign(
+        region=df["region"].str.upper(),
+        track_id=df["url"].str.extract(TRACK_ID_RE, expand=False),
+        streams=pd.to_numeric(df["streams"], errors="coerce").fillna(0).clip(lower=0),
+    )
+    return df.dropna(subset=["track_id"])[["region", "date", "track_id", "streams"]]
+
+
+def chart_matrix(day: pd.DataFrame) -> tuple[np.ndarray, sp.csr_matrix]:
+    """
+    Matriz dispersa región × canción con los streams de un día (o ventana).
+    """
+    r_codes, regions = pd.factorize(day["region"], sort=True)
+    t_codes, tracks = pd.factorize(day["track_id"])
+    S = sp.csr_matrix((day["streams"].to_numpy(dtype=np.float64), (r_codes, t_codes)),
+                      shape=(len(regions), len(tracks)))
+    return np.asarray(regions), S
+
+
+def similarity(S: sp.csr_matrix) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Similitud entre todas las regiones a la vez:
+      - jaccard: |A ∩ B| / |A ∪ B| sobre el conjunto de canciones del chart
+      - cosine:  coseno entre los vectores de streams
+    """
+    B = S.copy()
+    B.data[:] = 1.0
+    inter = (B @ B.T).toarray()
+    size = np.diag(inter)
+    union = size[:, None] + size[None, :] - inter
+    jaccard = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+    norm = np.sqrt(np.asarray(S.multiply(S).sum(axis=1)).ravel())
+    inv = np.divide(1.0, norm, out=np.zeros_like(norm), where=norm > 0)
+    Sn = sp.diags(inv) @ S
+    cosine = (Sn @ Sn.T).toarray()
+    return jaccard, cosine
+
+
+def input_key(path: str, include_global: bool = False) -> str:
+    """Huella del CSV completo (ruta, tamaño, mtime) y de --include-global."""
+    st = os.stat(path)
+    return f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}|global={int(include_global)}"
+
+
+def day_key(day: pd.DataFrame, include_global: bool = False) -> str:
+    """Huella de las filas de un día (independiente del resto del CSV) y de --include-global."""
+    rows = day[["region", "track_id", "streams"]].sort_values(["region", "track_id", "streams"])
+    digest = hashlib.sha1(pd.util.hash_pandas_object(rows, index=False).values.tobytes()).hexdigest()
+    return f"{digest}|global={int(include_global)}"
+
+
+def read_cached(date: str, cache_dir: str = CACHE_DIR) -> dict | None:
+    """Contenido del .npz de un día (matrices + huellas 'key' e 'input'), o None si no está."""
+    path = Path(cache_dir) / f"{date}.npz"
+    if not path.exists():
+        return None
+    with np.load(path, allow_pickle=False) as z:
+        return {k: z[k] for k in z.files}
+
+
+def _result(cached: dict) -> dict:
+    # {} para los días sin filas (también se cachean, vacíos)
+    if not len(cached["regions"]):
+        return {}
+    return {k: cached[k] for k in ("regions", "jaccard", "cosine")}
+
+
+def day_similarity(charts: pd.DataFrame, date: str, cache_dir: str = CACHE_DIR,
+                   include_global: bool = False, input_sig: str = "") -> dict:
+    """
+    Similitudes de un día, cacheadas en {cache_dir}/{date}.npz con la huella de las filas
+    de ese día (day_key): si el CSV cambia, p.ej. al añadir un día nuevo, sólo se recalculan
+    los días cuyo contenido ha cambiado. `input_sig` (input_key del CSV) se guarda para que
+    main() pueda usar la caché sin volver a leer un CSV que no ha cambiado.
+    """
+    day = charts[charts["date"] == date]
+    key = day_key(day, include_global)
+    cached = read_cached(date, cache_dir)
+    if cached is not None and str(cached.get("key")) == key:
+        res = {k: cached[k] for k in ("regions", "jaccard", "cosine")}
+        if str(cached.get("input")) == input_sig:
+            return _result(res)
+    elif day.empty:
+        res = {"regions": np.array([], dtype=str), "jaccard": np.zeros((0, 0)), "cosine": np.zeros((0, 0))}
+    else:
+        regions, S = chart_matrix(day)
+        jaccard, cosine = similarity(S)
+        res = {"regions": regions.astype(str), "jaccard": jaccard, "cosine": cosine}
+    path = Path(cache_dir) / f"{date}.npz"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(path, key=np.array(key), input=np.array(input_sig), **res)
+    return _result(res)
+
+
+def window_mean(days: list[dict], metric: str) -> pd.DataFrame:
+    """
+    Media de la matriz de similitud sobre varios días, alineando regiones
+    (una región ausente en un día no cuenta para ese día).
+    """
+    regions = sorted({r for d in days for r in d["regions"]})
+    idx = {r: i for i, r in enumerate(regions)}
+    acc = np.zeros((len(regions), len(regions)))
+    cnt = np.zeros_like(acc)
+    for d in days:
+        pos = np.array([idx[r] for r in d["regions"]])
+        acc[np.ix_(pos, pos)] += d[metric]
+        cnt[np.ix_(pos, pos)] += 1
+    mean = np.divide(acc, cnt, out=np.full_like(acc, np.nan), where=cnt > 0)
+    return pd.DataFrame(mean, index=regions, columns=regions)
+
+
+def mood_correlation(summary: pd.DataFrame, metric: str = "w_mean_streams", min_periods: int = 3,
+                     start: str | None = None, end: str | None = None) -> pd.DataFrame:
+    """
+    Correlación de Pearson entre las series diarias de mood de todos los países.
+    """
+    s = summary
+    if start:
+        s = s[s["date"] >= start]
+    if end:
+        s = s[s["date"] <= end]
+    wide = s.pivot_table(index="date", columns="country", values=metric)
+    return wide.corr(min_periods=min_periods)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Cross-country chart similarity (Jaccard / cosine) and mood correlation matrices.")
+    ap.add_argument("--input", default=CHARTS_PATH, help="Worldwide daily charts CSV")
+    ap.add_argument("--date", action="append", help="Date(s) YYYY-MM-DD (repeatable)")
+    ap.add_argument("--start", help="Window start YYYY-MM-DD (inclusive)")
+    ap.add_argument("--end", help="Window end YYYY-MM-DD (inclusive)")
+    ap.add_argument("--summary", default=SUMMARY_PATH, help="Summary CSV for mood correlations")
+    ap.add_argument("--metric", default="w_mean_streams", help="Summary metric to correlate")
+    ap.add_argument("--include-global", action="store_true", help="Keep the 'global' region as another row/column")
+    ap.add_argument("--cache-dir", default=CACHE_DIR)
+    ap.add_argument("--outdir", default=OUT_DIR)
+    args = ap.parse_args()
+
+    if args.date:
+        dates = sorted(set(args.date))
+    elif args.start and args.end:
+        dates = [str(d.date()) for d in pd.date_range(args.start, args.end)]
+    else:
+        ap.error("Use --date (repeatable) or --start/--end")
+
+    # Si todos los días están en caché y el CSV no ha cambiado desde entonces, no se lee;
+    # si no, se lee y sólo se recalculan los días cuyas filas han cambiado (ver day_similarity)
+    key = input_key(args.input, args.include_global)
+    cached = [read_cached(d, args.cache_dir) for d in dates]
+    if all(c is not None and str(c.get("input")) == key for c in cached):
+        days = [r for r in map(_result, cached) if r]
+    else:
+        charts = load_charts(args.input, dates, args.include_global)
+        days = [r for r in (day_similarity(charts, d, args.cache_dir, args.include_global, key) for d in dates) if r]
+    if not days:
+        print("⚠️ No chart data for the selected dates.")
+        return
+
+    tag = dates[0] if len(dates) == 1 else f"{dates[0]}_{dates[-1]}"
+    Path(args.outdir).mkdir(parents=True, exist_ok=True)
+    for metric in ["jaccard", "cosine"]:
+        out = Path(args.outdir) / f"similarity_{metric}_{tag}.csv"
+        window_mean(days, metric).to_csv(out)
+        print(f"✅ Saved: {out} ({len(days)} days)")
+
+    if Path(args.summary).exists():
+        corr = mood_correlation(pd.read_csv(args.summary), args.metric, start=dates[0], end=dates[-1])
+        out = Path(args.outdir) / f"mood_correlation_{tag}.csv"
+        corr.to_csv(out)
+        print(f"✅ Saved: {out}")
+
+
+if __name__ == "__main__":
+    main()
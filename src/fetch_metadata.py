@@ -1,4 +1,6 @@
 import argparse
+import json
+import os
 from typing import Optional
 import time
 
@@ -7,24 +9,41 @@ from tqdm import tqdm
 from spotipy import Spotify
 from spotipy.exceptions import SpotifyException
 
-from utils import get_spotify_client
+from search_cache import SearchCache
+from telemetry import TELEMETRY_DIR, Telemetry
+from utils import get_spotify_client, get_headless_client, get_offline_client, make_pooled_session
 
 
-def search_track_id(sp: Spotify, track_name: str, artist_name: str) -> Optional[str]:
+def search_track_id(sp: Spotify, track_name: str, artist_name: str, strict: bool = False,
+                    cache: Optional[SearchCache] = None) -> Optional[str]:
+    # strict=True: las SpotifyException se propagan en vez de devolver None,
+    # para distinguir "no encontrado" (definitivo) de un error (reintentable)
+    if cache is not None:
+        hit, track_id = cache.get(track_name, artist_name)
+        if hit:
+            return track_id
+
     query = f"track:{track_name} artist:{artist_name}"
     try:
         results = sp.search(q=query, type="track", limit=1)
     except SpotifyException as e:
+        if strict:
+            raise
         print(f"⚠️ Error searching '{track_name}' by '{artist_name}': {e}")
         return None
     items = results.get("tracks", {}).get("items", [])
-    return items[0]["id"] if items else None
+    track_id = items[0]["id"] if items else None
+    if cache is not None:
+        cache.put(track_name, artist_name, track_id)
+    return track_id
 
 
-def build_metadata_row_by_id(sp: Spotify, track_id: str, country: str, date: str) -> Optional[dict]:
+def build_metadata_row_by_id(sp: Spotify, track_id: str, country: str, date: str, strict: bool = False) -> Optional[dict]:
     try:
         track = sp.track(track_id)
     except SpotifyException as e:
+        if strict:
+            raise
         print(f"⚠️ Error fetching track {track_id}: {e}")
         return None
 
@@ -36,6 +55,8 @@ def build_metadata_row_by_id(sp: Spotify, track_id: str, country: str, date: str
     try:
         artist = sp.artist(artist_id)
     except SpotifyException as e:
+        if strict:
+            raise
         print(f"⚠️ Error fetching artist {artist_id}: {e}")
         return None
 
@@ -55,18 +76,54 @@ def build_metadata_row_by_id(sp: Spotify, track_id: str, country: str, date: str
     }
 
 
-def build_metadata_row_by_search(sp: Spotify, track_name: str, artist_name: str, country: str, date: str) -> Optional[dict]:
-    track_id = search_track_id(sp, track_name, artist_name)
+def build_metadata_row_by_search(sp: Spotify, track_name: str, artist_name: str, country: str, date: str,
+                                 strict: bool = False, cache: Optional[SearchCache] = None) -> Optional[dict]:
+    track_id = search_track_id(sp, track_name, artist_name, strict=strict, cache=cache)
     if track_id is None:
         print(f"❌ Not found on Spotify: '{track_name}' – '{artist_name}'")
         return None
-    return build_metadata_row_by_id(sp, track_id, country, date)
-
-
-def enrich_with_metadata(sp: Spotify, chart_df: pd.DataFrame, country: str, date: str) -> pd.DataFrame:
+    return build_metadata_row_by_id(sp, track_id, country, date, strict=strict)
+
+
+def load_journal(path: str) -> dict[str, Optional[dict]]:
+    """
+    Lee el journal de una ejecución anterior: {clave de canción: fila de metadata o None}.
+    None = resuelto como "no encontrado" (no se vuelve a pedir a la API).
+    Una última línea truncada (proceso matado a mitad de escritura) se ignora.
+    """
+    resolved: dict[str, Optional[dict]] = {}
+    if not os.path.exists(path):
+        return resolved
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            resolved[entry["key"]] = entry["meta"]
+    return resolved
+
+
+def enrich_with_metadata(sp: Spotify, chart_df: pd.DataFrame, country: str, date: str, pause: float = 0.15,
+                         journal_path: Optional[str] = None, search_cache: Optional[SearchCache] = None,
+                         telemetry: Optional[Telemetry] = None) -> pd.DataFrame:
+    """
+    Resuelve la metadata de cada fila del chart.
+    Con journal_path, cada canción resuelta se añade al journal (JSONL) en cuanto termina,
+    y las ya presentes en el journal se reutilizan sin llamar a la API: una ejecución
+    interrumpida se reanuda donde se quedó. Los errores de la API no se guardan,
+    así que esas canciones se reintentan en la siguiente ejecución.
+    Con search_cache, las filas sin track_id se resuelven primero contra la caché
+    persistente de búsquedas (incluidos los "no encontrado") antes de llamar a sp.search.
+    """
     chart_df.columns = [c.strip().lower() for c in chart_df.columns]
     rows: list[dict] = []
 
+    resolved = load_journal(journal_path) if journal_path else {}
+    if resolved:
+        print(f"♻️ Resuming: {len(resolved)} tracks already resolved in {journal_path}")
+    journal = open(journal_path, "a", encoding="utf-8") if journal_path else None
+
     # columnas extra que queremos arrastrar desde el chart (de momento, streams del día)
     extra_cols = []
     if "streams_chart" in chart_df.columns:
@@ -74,24 +131,51 @@ def enrich_with_metadata(sp: Spotify, chart_df: pd.DataFrame, country: str, date
 
     has_id = "track_id" in chart_df.columns
 
-    for _, row in tqdm(chart_df.iterrows(), total=len(chart_df), desc="Fetching metadata"):
-        if has_id and pd.notna(row["track_id"]):
-            meta = build_metadata_row_by_id(sp, str(row["track_id"]), country, date)
-        else:
-            track_name = str(row["track_name"])
-            artist_name = str(row["artist_name"])
-            meta = build_metadata_row_by_search(sp, track_name, artist_name, country, date)
-
-        if meta is not None:
-            # copiar columnas extra desde el chart a la salida
-            for c in extra_cols:
-                val = row.get(c)
-                # si hay NaN, lo dejamos como None para no romper tipos
-                meta[c] = None if pd.isna(val) else val
-            rows.append(meta)
-
-        # pequeñísima pausa para evitar 429 (rate limit)
-        time.sleep(0.15)
+    try:
+        for _, row in tqdm(chart_df.iterrows(), total=len(chart_df), desc="Fetching metadata"):
+            if has_id and pd.notna(row["track_id"]):
+                key = f"id:{row['track_id']}"
+            else:
+                track_name = str(row["track_name"])
+                artist_name = str(row["artist_name"])
+                key = f"name:{track_name}|{artist_name}"
+
+            if key in resolved:
+                meta = resolved[key]
+            else:
+                try:
+                    if key.startswith("id:"):
+                        meta = build_metadata_row_by_id(sp, str(row["track_id"]), country, date, strict=True)
+                    else:
+                        meta = build_metadata_row_by_search(sp, track_name, artist_name, country, date,
+                                                            strict=True, cache=search_cache)
+                except SpotifyException as e:
+                    print(f"⚠️ Error fetching {key}: {e}")
+                    meta = None
+                    if telemetry is not None:
+                        telemetry.record_dropped_row()
+                else:
+                    resolved[key] = meta
+                    if journal is not None:
+                        journal.write(json.dumps({"key": key, "meta": meta}, ensure_ascii=False) + "\n")
+                        journal.flush()
+                        os.fsync(journal.fileno())
+
+                # pequeñísima pausa para evitar 429 (rate limit)
+                if pause:
+                    time.sleep(pause)
+
+            if meta is not None:
+                meta = dict(meta)
+                # copiar columnas extra desde el chart a la salida
+                for c in extra_cols:
+                    val = row.get(c)
+                    # si hay NaN, lo dejamos como None para no romper tipos
+                    meta[c] = None if pd.isna(val) else val
+                rows.append(meta)
+    finally:
+        if journal is not None:
+            journal.close()
 
     return pd.DataFrame(rows) if rows else pd.DataFrame()
 
@@ -103,17 +187,49 @@ def main():
     parser.add_argument("--country", required=True, help="Country name (stored as metadata column)")
     parser.add_argument("--date", required=True, help="Date string (stored as metadata column)")
     parser.add_argument("--out", required=True, help="Output CSV file path for the enriched metadata")
+    parser.add_argument("--pause", type=float, default=0.15, help="Seconds to sleep between tracks (default: 0.15)")
+    parser.add_argument("--api-base", help="Use a local API stand-in (e.g. http://127.0.0.1:8900 from mock_spotify.py)")
+    parser.add_argument("--oauth", action="store_true", help="Use the browser-based Authorization Code flow instead of client credentials")
+    parser.add_argument("--fresh", action="store_true", help="Ignore (and discard) a checkpoint journal from a previous interrupted run")
+    parser.add_argument("--no-search-cache", action="store_true", help="Do not use the persistent name→track_id search cache")
+    parser.add_argument("--telemetry-out", help=f"API telemetry file (.json or .prom). Default: {TELEMETRY_DIR}/<out name>.json")
     args = parser.parse_args()
 
-    sp = get_spotify_client()
+    # Checkpoint junto al fichero de salida; se borra al terminar correctamente
+    journal_path = args.out + ".journal.jsonl"
+    if args.fresh and os.path.exists(journal_path):
+        os.remove(journal_path)
+
+    telemetry = Telemetry(country=args.country, date=args.date)
+    if args.api_base:
+        sp = telemetry.wrap(get_offline_client(args.api_base, requests_session=make_pooled_session(telemetry=telemetry)))
+    elif args.oauth:
+        sp = get_spotify_client(telemetry=telemetry)
+    else:
+        sp = get_headless_client(telemetry=telemetry)
     chart_df = pd.read_csv(args.chart)
-    df_out = enrich_with_metadata(sp, chart_df, country=args.country, date=args.date)
+    cache = None if args.no_search_cache else SearchCache()
+    df_out = enrich_with_metadata(sp, chart_df, country=args.country, date=args.date, pause=args.pause,
+                                  journal_path=journal_path, search_cache=cache, telemetry=telemetry)
+    if cache is not None:
+        print(f"🔎 Search cache: {cache.hits} hits, {cache.misses} misses")
+        cache.close()
+
+    telemetry_out = args.telemetry_out or os.path.join(TELEMETRY_DIR, os.path.splitext(os.path.basename(args.out))[0] + ".json")
+    print(f"📡 API telemetry: {telemetry.export(telemetry_out)}")
 
     if df_out.empty:
+        # la ejecución terminó (sin resultados): el checkpoint ya no sirve
+        if os.path.exists(journal_path):
+            os.remove(journal_path)
         print("⚠️ No tracks could be resolved. Check your input file.")
         return
 
-    df_out.to_csv(args.out, index=False)
+    # Escritura atómica: nunca queda un CSV final a medias
+    tmp_path = args.out + ".tmp"
+    df_out.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, args.out)
+    os.remove(journal_path)
     print(f"✅ Saved: {args.out} ({len(df_out)} rows)")
 
 
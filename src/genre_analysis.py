@@ -0,0 +1,150 @@
+import argparse
+import glob
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+import mood_dataset
+
+IN_PATTERN = "data/processed/*_mood_*.csv"
+OUT_PATH   = "data/processed/genre_summary.csv"
+
+
+def load_processed(pattern: str = IN_PATTERN, dataset: str = mood_dataset.DATASET_PATH,
+                   dates: list[str] | None = None) -> pd.DataFrame:
+    """Filas procesadas desde el dataset particionado (si existe) o, si no, desde los CSV."""
+    if mood_dataset.exists(dataset):
+        return mood_dataset.read(dataset, dates=dates,
+                                 columns=["country", "date", "mood_index", "streams_chart", "artist_genres"])
+    frames = [pd.read_csv(p) for p in glob.glob(pattern)]
+    frames = [f for f in frames if not f.empty]
+    df = pd.concat(frames, ignore_index=True, sort=False) if frames else pd.DataFrame()
+    return df[df["date"].astype(str).isin(dates)] if dates and not df.empty else df
+
+
+def encode_genres(genres: pd.Series) -> tuple[sp.csr_matrix, pd.Index]:
+    """
+    Codifica la columna 'artist_genres' ("pop; dance pop; ...") como matriz dispersa
+    canción × género (indicadora 0/1) con códigos categóricos para los géneros.
+    Sólo se parte cada cadena distinta una vez (muchas filas comparten artista):
+    la matriz final se obtiene indexando la de cadenas únicas.
+    """
+    codes, uniques = pd.factorize(genres.fillna("").astype(str))
+    g = pd.Series(uniques).str.split(";").explode().str.strip()
+    g = g[g != ""]
+    cat = pd.Categorical(g.values)
+    U = sp.csr_matrix((np.ones(len(g)), (g.index.to_numpy(), cat.codes)), shape=(len(uniques), len(cat.categories)))
+    U.data[:] = 1.0  # géneros duplicados en una misma cadena cuentan una vez
+    return U[codes], cat.categories
+
+
+def group_matrix(keys: pd.DataFrame, weights: np.ndarray) -> tuple[sp.csr_matrix, pd.DataFrame]:
+    """
+    Matriz dispersa grupo × fila con los pesos de cada fila en su grupo (país, fecha).
+    """
+    codes, uniques = pd.factorize(pd.MultiIndex.from_frame(keys))
+    G = sp.csr_matrix((weights, (codes, np.arange(len(codes)))), shape=(len(uniques), len(codes)))
+    return G, uniques.to_frame(index=False)
+
+
+def genre_mood(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Mood y cuota de streams por (país, fecha, género), todo con productos de matrices dispersas:
+      - share:       streams de canciones con ese género / streams totales del país-día
+      - genre_mood:  mood medio ponderado por streams de esas canciones
+      - mood_lift:   share × (genre_mood − country_mood): cuánto sube (o baja) el género
+                     el mood del país respecto a su media
+    Sin 'streams_chart' se pondera cada canción por igual.
+    """
+    df = df.reset_index(drop=True)
+    mood = pd.to_numeric(df["mood_index"], errors="coerce")
+    if "streams_chart" in df.columns:
+        w = pd.to_numeric(df["streams_chart"], errors="coerce").clip(lower=0)
+    else:
+        w = pd.Series(1.0, index=df.index)
+    w = w.where(mood.notna(), 0).fillna(0).to_numpy(dtype=np.float64)
+    m = mood.fillna(0).to_numpy(dtype=np.float64)
+
+    X, genres = encode_genres(df["artist_genres"] if "artist_genres" in df.columns else pd.Series("", index=df.index))
+    G, groups = group_matrix(df[["country", "date"]].astype(str), w)
+    Gm = G.multiply(m).tocsr()  # pesos × mood
+
+    total = np.asarray(G.sum(axis=1)).ravel()
+    country_mood = np.divide(np.asarray(Gm.sum(axis=1)).ravel(), total, out=np.full_like(total, np.nan), where=total > 0)
+
+    W = (G @ X).tocoo()    # streams por (grupo, género)
+    WM = (Gm @ X).tocsr()  # streams × mood por (grupo, género)
+
+    streams = W.data
+    wm = np.asarray(WM[W.row, W.col]).ravel()
+    share = streams / total[W.row]
+    g_mood = wm / streams
+    out = pd.DataFrame({
+        "country": groups.iloc[W.row, 0].values,
+        "date": groups.iloc[W.row, 1].values,
+        "genre": genres[W.col],
+        "streams": streams,
+        "share": share,
+        "genre_mood": g_mood,
+        "country_mood": country_mood[W.row],
+    })
+    out = out[out["streams"] > 0]
+    out["mood_lift"] = out["share"] * (out["genre_mood"] - out["country_mood"])
+    return out.sort_values(["date", "country", "streams"], ascending=[True, True, False]).reset_index(drop=True)
+
+
+def plot_drivers(summary: pd.DataFrame, outdir: str, top: int = 8):
+    import matplotlib.pyplot as plt
+
+    os.makedirs(outdir, exist_ok=True)
+    # media sobre las fechas seleccionadas; un género ausente en una fecha aporta 0
+    n_dates = summary.groupby("country")["date"].nunique()
+    lift = summary.groupby(["country", "genre"])["mood_lift"].sum().div(n_dates, level="country")
+
+    for country, s in lift.groupby(level="country"):
+        s = s.droplevel("country")
+        s = s.reindex(s.abs().sort_values(ascending=False).index).head(top).sort_values()
+        plt.figure(figsize=(8, 5))
+        plt.barh(s.index, s.values, color=["#d9534f" if v < 0 else "#5cb85c" for v in s.values], edgecolor="black")
+        plt.axvline(0, color="black", linewidth=0.8)
+        plt.title(f"Genres Driving Music Mood: {country}", fontsize=14)
+        plt.xlabel("Mood lift (share × (genre mood − country mood))", fontsize=11)
+        plt.grid(axis="x", linestyle="--", alpha=0.7)
+        plt.tight_layout()
+        out = os.path.join(outdir, f"genre_drivers_{str(country).replace(' ', '_')}.png")
+        plt.savefig(out, dpi=300)
+        plt.close()
+        print(f"✅ Saved: {out}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Stream-weighted mood and genre share per country/date (sparse genre matrix).")
+    ap.add_argument("--dataset", default=mood_dataset.DATASET_PATH, help="Processed dataset (from process_data.py)")
+    ap.add_argument("--input", default=IN_PATTERN, help="Glob of processed CSVs, used if --dataset does not exist")
+    ap.add_argument("--out", default=OUT_PATH, help="Output genre summary CSV")
+    ap.add_argument("--date", action="append", help="Restrict the analysis to these dates (repeatable)")
+    ap.add_argument("--top", type=int, default=8, help="Genres per country in the chart")
+    ap.add_argument("--outdir", default="figures")
+    ap.add_argument("--no-plot", action="store_true")
+    args = ap.parse_args()
+
+    df = load_processed(args.input, args.dataset, args.date)
+    if df.empty or "artist_genres" not in df.columns:
+        print("⚠️ No processed files with 'artist_genres' found.")
+        return
+
+    summary = genre_mood(df)
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    summary.to_csv(args.out, index=False)
+    print(f"✅ Saved genre summary: {args.out} ({len(summary)} rows, {summary['genre'].nunique()} genres)")
+
+    if not args.no_plot:
+        sel = summary[summary["date"].isin(args.date)] if args.date else summary
+        plot_drivers(sel, args.outdir, top=args.top)
+
+
+if __name__ == "__main__":
+    main()
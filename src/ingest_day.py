@@ -0,0 +1,208 @@
+import argparse
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from process_data import norm_text
+
+FEATURES_CLEAN = "data/interim/audio_features_clean.csv"
+DAILY_PATH     = "data/processed/daily_mood.csv"
+STATE_PATH     = "data/interim/rolling_state.json"
+
+WINDOWS = [7, 28]
+RING = max(WINDOWS)
+
+TRACK_ID_RE = r"(?:track/|track:)([0-9A-Za-z]{22})"
+
+
+def load_features(path: str = FEATURES_CLEAN, norm_path: str | None = None) -> pd.DataFrame:
+    """
+    Audio features con las claves normalizadas (t_norm, a_norm) ya calculadas.
+    norm_text es caro sobre ~130k filas, así que se cachea junto al fichero de entrada
+    (<features>.norm.csv) y sólo se recalcula si éste cambia.
+    """
+    if norm_path is None:
+        norm_path = str(Path(path).with_suffix(".norm.csv"))
+    if os.path.exists(norm_path) and os.path.getmtime(norm_path) >= os.path.getmtime(path):
+        # las claves se leen tal cual (sin NA), como salen de norm_text: "" sigue siendo ""
+        return pd.read_csv(norm_path, converters={"t_norm": str, "a_norm": str})
+    feats = pd.read_csv(path)
+    feats.columns = [c.strip().lower() for c in feats.columns]
+    feats["t_norm"] = feats["track_name"].map(norm_text)
+    feats["a_norm"] = feats["artist_name"].map(norm_text)
+    feats.to_csv(norm_path, index=False)
+    return feats
+
+
+def day_tracks(charts: pd.DataFrame, feats: pd.DataFrame) -> pd.DataFrame:
+    """
+    Filas del día (región × canción) con mood_index: merge por track_id y, para las
+    no emparejadas, por (track_name, artist_name) normalizados como en process_data.py.
+    """
+    df = charts.copy()
+    df.columns = [c.strip().lower() for c in df.columns]
+    df = df.rename(columns={"track name": "track_name", "artist": "artist_name", "streams": "streams_chart"})
+    df["region"] = df["region"].str.upper()
+    df["track_id"] = df["url"].str.extract(TRACK_ID_RE, expand=False)
+    df["streams_chart"] = pd.to_numeric(df["streams_chart"], errors="coerce")
+
+    f = feats[["track_id", "t_norm", "a_norm", "valence", "energy"]]
+    by_id = df.merge(f.drop(columns=["t_norm", "a_norm"]).drop_duplicates("track_id"), on="track_id", how="left")
+
+    miss = by_id["valence"].isna()
+    if miss.any():
+        rest = by_id.loc[miss].drop(columns=["valence", "energy"])
+        rest["t_norm"] = rest["track_name"].map(norm_text)
+        rest["a_norm"] = rest["artist_name"].map(norm_text)
+        # norm_text deja vacíos los títulos/artistas no latinos: una clave vacía no identifica
+        # ninguna canción, así que esas filas no se emparejan por nombre
+        named = f[(f["t_norm"] != "") & (f["a_norm"] != "")].drop(columns=["track_id"])
+        by_name = rest.merge(named.drop_duplicates(["t_norm", "a_norm"]),
+                             on=["t_norm", "a_norm"], how="left").drop(columns=["t_norm", "a_norm"])
+        by_id = pd.concat([by_id.loc[~miss], by_name], ignore_index=True)
+
+    by_id["mood_index"] = (pd.to_numeric(by_id["valence"], errors="coerce") +
+                           pd.to_numeric(by_id["energy"], errors="coerce")) / 2
+    return by_id
+
+
+def region_day(tracks: pd.DataFrame) -> pd.DataFrame:
+    """
+    Mood por región para el día: tamaño del chart, canciones emparejadas,
+    media simple y media ponderada por streams (con sus sumas, para las ventanas).
+    """
+    t = tracks.assign(
+        matched=tracks["mood_index"].notna(),
+        w=tracks["streams_chart"].clip(lower=0).where(tracks["mood_index"].notna(), 0).fillna(0),
+    )
+    t["wx"] = t["w"] * t["mood_index"].fillna(0)
+    g = t.groupby("region")
+    out = pd.DataFrame({
+        "n_chart": g.size(),
+        "n_matched": g["matched"].sum(),
+        "mean": g["mood_index"].mean(),
+        "sum_w": g["w"].sum(),
+        "sum_wx": g["wx"].sum(),
+    }).reset_index()
+    out["match_rate"] = out["n_matched"] / out["n_chart"]
+    out["w_mean_streams"] = out["sum_wx"] / out["sum_w"].where(out["sum_w"] > 0)
+    return out
+
+
+def load_state(path: str = STATE_PATH) -> dict:
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    return {"windows": WINDOWS, "regions": {}}
+
+
+def save_state(state: dict, path: str = STATE_PATH):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def advance(st: dict, day: int, wx: float, w: float):
+    """
+    Avanza el estado de una región hasta `day` con O(1) trabajo por día:
+    anillo de los últimos RING días + sumas corrientes por ventana
+    (se suma el día que entra y se resta el que sale). Los días sin datos
+    entre medias cuentan como vacíos; un hueco >= RING reinicia el estado.
+    """
+    last = st.get("last_day")
+    if last is None or day - last >= RING:
+        st["ring_wx"], st["ring_w"] = [0.0] * RING, [0.0] * RING
+        st["sums"] = {str(W): [0.0, 0.0] for W in WINDOWS}
+        last = day - 1
+
+    for t in range(last + 1, day + 1):
+        v_wx, v_w = (wx, w) if t == day else (0.0, 0.0)
+        for W in WINDOWS:
+            old = (t - W) % RING
+            s = st["sums"][str(W)]
+            s[0] += v_wx - st["ring_wx"][old]
+            s[1] += v_w - st["ring_w"][old]
+        st["ring_wx"][t % RING], st["ring_w"][t % RING] = v_wx, v_w
+    st["last_day"] = day
+
+
+def ingest(charts: pd.DataFrame, feats: pd.DataFrame, date: str, state: dict) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Ingresa un día: devuelve (mood por región con ventanas móviles, filas por canción)
+    y actualiza `state` en memoria. Coste proporcional a las filas del día.
+    """
+    tracks = day_tracks(charts, feats)
+    regions = region_day(tracks)
+    day = int(np.datetime64(date, "D").astype(np.int64))
+
+    for region in regions["region"]:
+        last = state["regions"].get(region, {}).get("last_day")
+        if last is not None and day <= last:
+            raise ValueError(f"{region}: {date} is not after the last ingested day")
+
+    for W in WINDOWS:
+        regions[f"roll{W}_w_mean_streams"] = np.nan
+    for i, r in regions.iterrows():
+        st = state["regions"].setdefault(r["region"], {})
+        advance(st, day, float(r["sum_wx"]), float(r["sum_w"]))
+        for W in WINDOWS:
+            s_wx, s_w = st["sums"][str(W)]
+            regions.at[i, f"roll{W}_w_mean_streams"] = s_wx / s_w if s_w > 0 else np.nan
+
+    regions.insert(1, "date", date)
+    return regions, tracks
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Append one new day of charts: per-region mood + 7/28-day rolling stream-weighted mood.")
+    ap.add_argument("--charts", required=True, help="Charts CSV (same format as the worldwide daily ranking)")
+    ap.add_argument("--date", help="Day to ingest (default: the only date in --charts)")
+    ap.add_argument("--features", default=FEATURES_CLEAN, help="Audio features CSV (from load_public_data.py)")
+    ap.add_argument("--out", default=DAILY_PATH, help="Append-only daily mood CSV")
+    ap.add_argument("--state", default=STATE_PATH, help="Rolling-window state (JSON)")
+    ap.add_argument("--detect", action="store_true", help="Run the online change-point detector on the new day (see changepoint.py)")
+    ap.add_argument("--cp-state", help="Change-point detector state for --detect (default: data/interim/changepoint_state.json)")
+    ap.add_argument("--events", help="Mood events CSV appended by --detect (default: data/processed/mood_events.csv)")
+    args = ap.parse_args()
+
+    charts = pd.read_csv(args.charts)
+    date_col = next(c for c in charts.columns if c.strip().lower() == "date")
+    dates = sorted(charts[date_col].astype(str).unique())
+    if args.date:
+        charts = charts[charts[date_col].astype(str) == args.date]
+        date = args.date
+    elif len(dates) == 1:
+        date = dates[0]
+    else:
+        ap.error(f"--charts has {len(dates)} dates; choose one with --date")
+    if charts.empty:
+        print(f"⚠️ No chart rows for {date}")
+        return
+
+    state = load_state(args.state)
+    try:
+        regions, tracks = ingest(charts, load_features(args.features), date, state)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    regions.to_csv(args.out, mode="a", header=not os.path.exists(args.out), index=False)
+    save_state(state, args.state)
+    print(f"✅ Ingested {date}: {len(regions)} regions appended to {args.out}")
+
+    if args.detect:
+        from changepoint import EVENTS_PATH, STATE_PATH as CP_STATE_PATH, CusumDetector, append_events, detect_day
+        cp_state = args.cp_state or CP_STATE_PATH
+        det = CusumDetector.load(cp_state)
+        append_events(detect_day(det, regions, tracks), args.events or EVENTS_PATH)
+        det.save(cp_state)
+
+
+if __name__ == "__main__":
+    main()
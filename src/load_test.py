@@ -0,0 +1,108 @@
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import quote
+
+import numpy as np
+
+
+def discover_paths(host: str, port: int) -> list[str]:
+    """
+    Construye la mezcla de peticiones a partir de lo que sirve el propio servicio:
+    /metrics por país, por fecha y por (país, fecha) y /tracks por (país, fecha).
+    """
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    conn.request("GET", "/metrics")
+    rows = json.loads(conn.getresponse().read())
+    conn.close()
+
+    paths = ["/countries", "/metrics"]
+    for r in rows:
+        c, d = quote(str(r["country"])), quote(str(r["date"]))
+        paths += [f"/metrics?country={c}", f"/metrics?date={d}",
+                  f"/metrics?country={c}&date={d}", f"/tracks?country={c}&date={d}"]
+    return sorted(set(paths))
+
+
+def worker(host: str, port: int, paths: list[str], deadline: float, seed: int,
+           latencies: list[float], errors: list[int]):
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    while time.perf_counter() < deadline:
+        path = rng.choice(paths)
+        t0 = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            resp = conn.getresponse()
+            resp.read()
+            ok = resp.status == 200
+        except (OSError, http.client.HTTPException):
+            ok = False
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=10)
+        latencies.append(time.perf_counter() - t0)
+        if not ok:
+            errors.append(1)
+    conn.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Load test for serve.py: p50/p99 latency and throughput.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--concurrency", type=int, default=8, help="Parallel keep-alive clients")
+    ap.add_argument("--duration", type=float, default=10.0, help="Seconds to run")
+    ap.add_argument("--path", action="append", help="Request path (repeatable). Default: discovered from /metrics")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--out", help="Optional JSON file to store the results")
+    args = ap.parse_args()
+
+    paths = args.path or discover_paths(args.host, args.port)
+    print(f"🎯 {len(paths)} distinct paths, {args.concurrency} clients, {args.duration:.0f}s")
+
+    per_thread = [[] for _ in range(args.concurrency)]
+    errors: list[int] = []
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(args.host, args.port, paths, deadline, args.seed + i, per_thread[i], errors))
+        for i in range(args.concurrency)
+    ]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    lat = np.array([x for xs in per_thread for x in xs]) * 1000.0
+    if lat.size == 0:
+        print("⚠️ No requests completed.")
+        return
+
+    p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+    result = {
+        "requests": int(lat.size),
+        "errors": len(errors),
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(lat.size / elapsed, 1),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(lat.max()), 3),
+        "concurrency": args.concurrency,
+    }
+    print(f"📊 {result['requests']} requests ({result['errors']} errors) in {result['seconds']}s "
+          f"→ {result['throughput_rps']} req/s")
+    print(f"📊 latency p50={result['p50_ms']} ms  p95={result['p95_ms']} ms  p99={result['p99_ms']} ms")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"💾 Saved results to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
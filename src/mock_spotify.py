@@ -0,0 +1,279 @@
+import argparse
+import json
+import random
+import re
+import string
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+GENRES = [
+    "pop", "dance pop", "latin", "reggaeton", "trap latino", "k-pop", "j-pop", "rock",
+    "indie", "hip hop", "rap", "edm", "house", "r&b", "sertanejo", "funk carioca",
+    "french hip hop", "german hip hop", "uk pop", "australian pop",
+]
+ID_ALPHABET = string.ascii_letters + string.digits
+
+
+def _spotify_id(rng: random.Random) -> str:
+    return "".join(rng.choice(ID_ALPHABET) for _ in range(22))
+
+
+def make_fixtures(n_tracks: int = 500, n_artists: int = 150, seed: int = 0) -> dict:
+    """
+    Catálogo sintético y determinista con la misma forma que las respuestas de la API
+    (sólo los campos que usa fetch_metadata.py).
+    """
+    rng = random.Random(seed)
+    artists = {}
+    for i in range(n_artists):
+        aid = _spotify_id(rng)
+        artists[aid] = {
+            "id": aid,
+            "name": f"Artist {i}",
+            "popularity": rng.randint(20, 100),
+            "followers": {"total": rng.randint(1_000, 50_000_000)},
+            "genres": rng.sample(GENRES, rng.randint(0, 3)),
+        }
+    artist_ids = list(artists)
+
+    tracks = {}
+    for i in range(n_tracks):
+        tid = _spotify_id(rng)
+        a = artists[rng.choice(artist_ids)]
+        tracks[tid] = {
+            "id": tid,
+            "name": f"Song {i}",
+            "popularity": rng.randint(0, 100),
+            "artists": [{"id": a["id"], "name": a["name"]}],
+            "album": {"name": f"Album {i // 10}", "release_date": f"{rng.randint(2000, 2018)}-01-01"},
+        }
+    return {"tracks": tracks, "artists": artists}
+
+
+class FaultConfig:
+    """
+    Inyección de fallos determinista:
+      - latency_ms (+ jitter_ms): retardo por petición
+      - burst_every / burst_len: en cada ventana de `burst_every` peticiones, las `burst_len`
+        últimas devuelven 429 con cabecera Retry-After = retry_after (segundos enteros); la
+        primera petición de una ejecución nunca se limita
+      - error_rate: probabilidad de 5xx (500/502/503)
+    """
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, burst_every: int = 0,
+                 burst_len: int = 1, retry_after: int = 1, error_rate: float = 0.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.burst_every = burst_every
+        self.burst_len = burst_len
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._n = 0
+
+    def next_fault(self) -> tuple[float, int | None]:
+        """Devuelve (retardo en segundos, código de error o None) para la siguiente petición."""
+        with self._lock:
+            self._n += 1
+            delay = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000.0
+            if self.burst_every and (self._n - 1) % self.burst_every >= self.burst_every - self.burst_len:
+                return delay, 429
+            if self.error_rate and self._rng.random() < self.error_rate:
+                return delay, self._rng.choice([500, 502, 503])
+            return delay, None
+
+
+class MockStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: dict[str, int] = {}
+        self.throttled = 0
+        self.server_errors = 0
+
+    def record(self, endpoint: str, status: int):
+        with self._lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            if status == 429:
+                self.throttled += 1
+            elif status >= 500:
+                self.server_errors += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {"calls": dict(self.calls), "throttled": self.throttled, "server_errors": self.server_errors}
+
+
+class MockSpotifyHandler(BaseHTTPRequestHandler):
+    """
+    Subconjunto de la Web API de Spotify:
+      GET  /v1/search?q=track:NAME artist:NAME&type=track&limit=1
+      GET  /v1/tracks/{id}     GET /v1/tracks?ids=a,b
+      GET  /v1/artists/{id}    GET /v1/artists?ids=a,b
+      POST /api/token          (client credentials, token ficticio)
+      GET  /_stats             (contadores del mock, sin fallos inyectados)
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    fixtures: dict = None
+    faults: FaultConfig = None
+    stats: MockStats = None
+    _search_index: dict = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, payload: dict, headers: dict | None = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, msg: str, headers: dict | None = None):
+        self._send(status, {"error": {"status": status, "message": msg}}, headers)
+
+    def _endpoint(self, path: str) -> str:
+        parts = path.strip("/").split("/")
+        if parts[:1] == ["v1"] and len(parts) >= 2:
+            return parts[1] if len(parts) == 2 else parts[1].rstrip("s")
+        return path
+
+    def _inject(self, endpoint: str) -> bool:
+        delay, fault = self.faults.next_fault()
+        if delay:
+            time.sleep(delay)
+        if fault == 429:
+            self.stats.record(endpoint, 429)
+            self._error(429, "API rate limit exceeded", {"Retry-After": str(self.faults.retry_after)})
+            return True
+        if fault is not None:
+            self.stats.record(endpoint, fault)
+            self._error(fault, "Injected server error")
+            return True
+        return False
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        if urlsplit(self.path).path != "/api/token":
+            return self._error(404, "Not found")
+        self.stats.record("token", 200)
+        self._send(200, {"access_token": "mock-token", "token_type": "Bearer", "expires_in": 3600})
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == "/_stats":
+            return self._send(200, self.stats.as_dict())
+
+        endpoint = self._endpoint(parts.path)
+        if self._inject(endpoint):
+            return
+
+        q = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        segs = parts.path.strip("/").split("/")
+        tracks, artists = self.fixtures["tracks"], self.fixtures["artists"]
+
+        if segs == ["v1", "search"]:
+            status, payload = 200, {"tracks": {"items": self._search(q.get("q", ""), int(q.get("limit", 1)))}}
+        elif segs[:2] == ["v1", "tracks"] and len(segs) == 3:
+            status, payload = (200, tracks[segs[2]]) if segs[2] in tracks else (404, None)
+        elif segs == ["v1", "tracks"]:
+            status, payload = 200, {"tracks": [tracks.get(i) for i in q.get("ids", "").split(",") if i]}
+        elif segs[:2] == ["v1", "artists"] and len(segs) == 3:
+            status, payload = (200, artists[segs[2]]) if segs[2] in artists else (404, None)
+        elif segs == ["v1", "artists"]:
+            status, payload = 200, {"artists": [artists.get(i) for i in q.get("ids", "").split(",") if i]}
+        else:
+            status, payload = 404, None
+
+        self.stats.record(endpoint, status)
+        if payload is None:
+            return self._error(status, "Non existing id" if status == 404 else "Bad request")
+        self._send(status, payload)
+
+    def _search(self, query: str, limit: int) -> list[dict]:
+        m = re.match(r"^track:(.*?)\s+artist:(.*)$", query.strip())
+        if not m:
+            return []
+        key = (m.group(1).strip().lower(), m.group(2).strip().lower())
+        return self._search_index.get(key, [])[:limit]
+
+
+def make_server(fixtures: dict, faults: FaultConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+    """
+    Crea (sin arrancar) el servidor mock. Con port=0 se elige un puerto libre:
+    la URL base queda en f"http://{host}:{server.server_address[1]}".
+    """
+    index: dict[tuple[str, str], list[dict]] = {}
+    for t in fixtures["tracks"].values():
+        for a in t["artists"]:
+            index.setdefault((t["name"].lower(), a["name"].lower()), []).append(t)
+
+    handler = type("BoundMockSpotifyHandler", (MockSpotifyHandler,), {
+        "fixtures": fixtures,
+        "faults": faults or FaultConfig(),
+        "stats": MockStats(),
+        "_search_index": index,
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.stats = handler.stats
+    return server
+
+
+def start_in_thread(fixtures: dict, faults: FaultConfig | None = None, host: str = "127.0.0.1"):
+    """Arranca el mock en un hilo daemon y devuelve (server, base_url)."""
+    server = make_server(fixtures, faults, host=host, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline stand-in for the Spotify Web API (search/track/tracks/artist/artists).")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8900)
+    ap.add_argument("--fixtures", help="JSON with {'tracks': {...}, 'artists': {...}}. Default: synthetic catalog")
+    ap.add_argument("--n-tracks", type=int, default=500, help="Synthetic catalog size (if no --fixtures)")
+    ap.add_argument("--dump-fixtures", help="Write the fixtures in use to this JSON file")
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--burst-every", type=int, default=0, help="Start a 429 burst every N requests (0 = never)")
+    ap.add_argument("--burst-len", type=int, default=1, help="Requests per 429 burst")
+    ap.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 5xx response")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    if args.fixtures:
+        with open(args.fixtures, encoding="utf-8") as f:
+            fixtures = json.load(f)
+    else:
+        fixtures = make_fixtures(n_tracks=args.n_tracks, n_artists=max(1, args.n_tracks // 3), seed=args.seed)
+
+    if args.dump_fixtures:
+        with open(args.dump_fixtures, "w", encoding="utf-8") as f:
+            json.dump(fixtures, f)
+        print(f"💾 Saved fixtures to {args.dump_fixtures}")
+
+    faults = FaultConfig(args.latency_ms, args.jitter_ms, args.burst_every, args.burst_len,
+                         args.retry_after, args.error_rate, args.seed)
+    server = make_server(fixtures, faults, args.host, args.port)
+    print(f"🚀 Mock Spotify API on http://{args.host}:{args.port} "
+          f"({len(fixtures['tracks'])} tracks, {len(fixtures['artists'])} artists)")
+    print(f"   Point the client at it: SPOTIFY_API_BASE=http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
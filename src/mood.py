@@ -0,0 +1,58 @@
+import argparse
+import importlib
+import sys
+
+# subcomando -> (módulo de src/, descripción). Los módulos se importan sólo al ejecutar su
+# subcomando: pandas/spotipy/matplotlib/geopandas tardan 0.5–1 s en cargar y `mood --help`
+# no debe pagar nada de eso.
+COMMANDS = {
+    "select":    ("select_from_charts", "Select the Top-N daily chart for a country/date and extract track_id"),
+    "fetch":     ("fetch_metadata", "Enrich a chart sample with Spotify metadata"),
+    "merge":     ("process_data", "Merge metadata with audio features and compute the Mood Index"),
+    "summarize": ("summarize", "Summarize every processed file into country_summary.csv (+ cube)"),
+    "render":    (None, "Render figures: mood render {countries,map,seasonal,compare,tracks,similarity} ..."),
+    "run":       ("multi_country_run", "Run select → fetch → merge for every task (see --in-process)"),
+}
+
+RENDERERS = {
+    "countries":  "visualize_countries",
+    "map":        "visualize_map",
+    "seasonal":   "visualize_seasonal",
+    "compare":    "visualize_compare",
+    "tracks":     "visualize",
+    "similarity": "visualize_similarity",
+}
+
+
+def dispatch(module: str, prog: str, argv: list[str]):
+    """Importa el módulo y ejecuta su main() como si fuera `python src/<module>.py argv...`."""
+    mod = importlib.import_module(module)
+    sys.argv = [prog, *argv]
+    mod.main()
+
+
+def main(argv: list[str] | None = None):
+    argv = sys.argv[1:] if argv is None else argv
+    ap = argparse.ArgumentParser(
+        prog="mood",
+        description="Mood of the World pipeline. Each subcommand takes the same options as its script; "
+                    "use `mood <command> --help` for them.",
+        epilog="commands:\n" + "\n".join(f"  {name:<11}{desc}" for name, (_, desc) in COMMANDS.items()),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    ap.add_argument("command", choices=list(COMMANDS), metavar="command")
+    # sólo se analiza el subcomando; el resto se pasa tal cual al script
+    command = ap.parse_args(argv[:1]).command
+    rest = argv[1:]
+
+    if command == "render":
+        rp = argparse.ArgumentParser(prog="mood render", description="Render figures with one of the visualize_* scripts.")
+        rp.add_argument("kind", choices=list(RENDERERS))
+        kind = rp.parse_args(rest[:1]).kind
+        dispatch(RENDERERS[kind], f"mood render {kind}", rest[1:])
+    else:
+        dispatch(COMMANDS[command][0], f"mood {command}", rest)
+
+
+if __name__ == "__main__":
+    main()
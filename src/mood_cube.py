@@ -0,0 +1,202 @@
+import argparse
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SUMMARY_PATH = "data/processed/country_summary.csv"
+CUBE_PATH    = "data/processed/mood_cube.npz"
+
+METRICS = [
+    "n_chart", "n_matched", "match_rate",
+    "mean", "median", "p25", "p75",
+    "w_mean_pop", "w_mean_streams",
+]
+LEVELS = ["day", "week", "month"]
+
+# Métricas que se suman al agregar (el resto se promedia sobre los días del periodo)
+SUM_METRICS = {"n_chart", "n_matched"}
+
+
+def _period_start(dates: pd.Series, level: str) -> pd.Series:
+    d = pd.to_datetime(dates).dt.normalize()
+    if level == "day":
+        return d
+    if level == "week":
+        # semanas ISO: lunes como inicio de periodo
+        return d - pd.to_timedelta(d.dt.weekday, unit="D")
+    if level == "month":
+        return d.dt.to_period("M").dt.start_time
+    raise ValueError(f"Unknown rollup level: {level}")
+
+
+def rollup(df: pd.DataFrame, level: str) -> pd.DataFrame:
+    """
+    Agrega el resumen diario (país × fecha) al nivel pedido.
+    - n_chart / n_matched se suman y match_rate se recalcula a partir de ellos
+    - el resto de métricas (medias, percentiles, medias ponderadas) se promedian
+      sobre los días disponibles del periodo
+    """
+    d = df.copy()
+    d["period"] = _period_start(d["date"], level)
+    if level == "day":
+        out = d.drop(columns=["date"])
+    else:
+        agg = {m: ("sum" if m in SUM_METRICS else "mean") for m in METRICS if m in d.columns}
+        out = d.groupby(["country", "period"], as_index=False).agg(agg)
+        if {"n_chart", "n_matched"}.issubset(out.columns):
+            out["match_rate"] = np.where(out["n_chart"] > 0, out["n_matched"] / out["n_chart"], np.nan)
+    return out.sort_values(["country", "period"]).reset_index(drop=True)
+
+
+def build_cube(summary: pd.DataFrame) -> dict:
+    """
+    Construye el cubo como arrays numpy ordenados por (región, periodo).
+    Para cada nivel guarda:
+      - {level}_period:  int64, días desde epoch (ordenado dentro de cada región)
+      - {level}_values:  float64 [filas × métricas]
+      - {level}_offsets: int64 [n_regiones + 1], tramo de filas de cada región
+    """
+    df = summary.copy()
+    for m in METRICS:
+        df[m] = pd.to_numeric(df[m], errors="coerce") if m in df.columns else np.nan
+
+    countries = np.array(sorted(df["country"].astype(str).unique()))
+    arrays = {"countries": countries, "metrics": np.array(METRICS)}
+
+    for level in LEVELS:
+        r = rollup(df, level)
+        region_idx = np.searchsorted(countries, r["country"].astype(str).values)
+        counts = np.bincount(region_idx, minlength=len(countries))
+        arrays[f"{level}_offsets"] = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        arrays[f"{level}_period"] = r["period"].values.astype("datetime64[D]").astype(np.int64)
+        arrays[f"{level}_values"] = r[METRICS].to_numpy(dtype=np.float64)
+
+    return arrays
+
+
+class MoodCube:
+    """
+    Cubo precalculado de métricas de mood (región × periodo) con consultas rápidas.
+
+    Las filas están ordenadas por (región, periodo), así que una consulta se resuelve
+    con un acceso directo por región y dos búsquedas binarias sobre el rango de fechas,
+    sin escanear el CSV.
+
+        cube = MoodCube.load()
+        cube.query(["Spain", "France"], "2017-08-01", "2017-08-31", metric="w_mean_streams", level="week")
+    """
+
+    def __init__(self, arrays: dict):
+        self.countries = [str(c) for c in arrays["countries"]]
+        self.metrics = [str(m) for m in arrays["metrics"]]
+        self._country_idx = {c: i for i, c in enumerate(self.countries)}
+        self._metric_idx = {m: i for i, m in enumerate(self.metrics)}
+        self._levels = {
+            level: (arrays[f"{level}_offsets"], arrays[f"{level}_period"], arrays[f"{level}_values"])
+            for level in LEVELS
+        }
+
+    @classmethod
+    def load(cls, path: str = CUBE_PATH) -> "MoodCube":
+        with np.load(path, allow_pickle=False) as z:
+            return cls({k: z[k] for k in z.files})
+
+    @classmethod
+    def from_summary(cls, summary_path: str = SUMMARY_PATH) -> "MoodCube":
+        return cls(build_cube(pd.read_csv(summary_path)))
+
+    @staticmethod
+    def _day(d) -> int | None:
+        if d is None:
+            return None
+        return int(np.datetime64(str(d)[:10], "D").astype(np.int64))
+
+    def query(self, countries=None, start=None, end=None, metric="w_mean_streams", level="day") -> dict:
+        """
+        Devuelve {país: (fechas datetime64[D], valores float64)} para el rango [start, end].
+        - countries: iterable de países (None = todos); los desconocidos se ignoran
+        - start/end: 'YYYY-MM-DD' (inclusive) o None para no acotar
+        - metric: una de METRICS
+        - level: 'day', 'week' o 'month' (fechas = inicio del periodo; se incluyen los
+          periodos que solapan el rango, p.ej. la semana que empieza antes de start)
+        """
+        if level not in self._levels:
+            raise ValueError(f"Unknown rollup level: {level}")
+        if metric not in self._metric_idx:
+            raise ValueError(f"Unknown metric: {metric}")
+
+        offsets, period, values = self._levels[level]
+        col = self._metric_idx[metric]
+        if start is not None and level != "day":
+            start = _period_start(pd.Series([str(start)[:10]]), level).iloc[0]
+        lo_day, hi_day = self._day(start), self._day(end)
+
+        out = {}
+        for c in (self.countries if countries is None else countries):
+            i = self._country_idx.get(c)
+            if i is None:
+                continue
+            a, b = int(offsets[i]), int(offsets[i + 1])
+            p = period[a:b]
+            lo = a + (0 if lo_day is None else int(np.searchsorted(p, lo_day, side="left")))
+            hi = a + (len(p) if hi_day is None else int(np.searchsorted(p, hi_day, side="right")))
+            out[c] = (period[lo:hi].astype("datetime64[D]"), values[lo:hi, col])
+        return out
+
+    def snapshot(self, date, metrics=("w_mean_streams",), level="day") -> pd.DataFrame:
+        """
+        Valores de una o varias métricas para todos los países en una fecha/periodo
+        (p.ej. para un mapa o un ranking).
+        """
+        d = self._day(date)
+        offsets, period, values = self._levels[level]
+        cols = [self._metric_idx[m] for m in metrics]
+        rows = []
+        for i, c in enumerate(self.countries):
+            a, b = int(offsets[i]), int(offsets[i + 1])
+            j = a + int(np.searchsorted(period[a:b], d, side="left"))
+            if j < b and period[j] == d:
+                rows.append({"country": c, **{m: float(values[j, k]) for m, k in zip(metrics, cols)}})
+        return pd.DataFrame(rows, columns=["country", *metrics])
+
+    def dates(self, level="day") -> list[str]:
+        _, period, _ = self._levels[level]
+        return [str(d) for d in np.unique(period).astype("datetime64[D]")]
+
+
+def resolve_cube(cube: str | None, summary: str) -> str | None:
+    """
+    Cubo a usar por los visualizadores, o None para leer el CSV de resumen:
+    - con --cube explícito, ese cubo (si existe)
+    - si no, el cubo por defecto sólo cuando --summary es el resumen por defecto y el
+      cubo no es más antiguo que él (si el resumen se regeneró por otra vía, está obsoleto)
+    """
+    if cube is not None:
+        return cube if os.path.exists(cube) else None
+    if os.path.abspath(summary) != os.path.abspath(SUMMARY_PATH) or not os.path.exists(CUBE_PATH):
+        return None
+    if os.path.exists(summary) and os.path.getmtime(CUBE_PATH) < os.path.getmtime(summary):
+        return None
+    return CUBE_PATH
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build the precomputed mood cube (region × day/week/month) from country_summary.csv.")
+    ap.add_argument("--summary", default=SUMMARY_PATH, help="Summary CSV (from summarize.py)")
+    ap.add_argument("--out", default=CUBE_PATH, help="Output cube file (.npz)")
+    args = ap.parse_args()
+
+    if not Path(args.summary).exists():
+        print(f"⚠️ Summary not found: {args.summary}. Run summarize.py first.")
+        return
+
+    arrays = build_cube(pd.read_csv(args.summary))
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    np.savez(args.out, **arrays)
+    print(f"✅ Saved cube: {args.out} ({len(arrays['countries'])} countries, {len(arrays['day_period'])} country-days)")
+
+
+if __name__ == "__main__":
+    main()
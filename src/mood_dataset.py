@@ -0,0 +1,174 @@
+import argparse
+import glob
+import os
+import re
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+DATASET_PATH = "data/processed/mood_dataset"
+CSV_PATTERN  = "data/processed/*_mood_*.csv"
+
+# country=<país>/date=<YYYY-MM-DD>/part-0.parquet
+PARTITIONING = ds.partitioning(pa.schema([("country", pa.string()), ("date", pa.string())]), flavor="hive")
+
+# Columnas tipadas de cada fila (canción × país × día); country/date van en la ruta
+COLUMNS = {
+    "track_name":        pa.string(),
+    "artist_name":       pa.string(),
+    "valence":           pa.float64(),
+    "energy":            pa.float64(),
+    "danceability":      pa.float64(),
+    "tempo":             pa.float64(),
+    "mood_index":        pa.float64(),
+    "track_popularity":  pa.int16(),
+    "artist_popularity": pa.int16(),
+    "artist_genres":     pa.string(),
+    "streams_chart":     pa.int64(),
+    "n_chart":           pa.int32(),   # filas del chart de ese país/día (para match_rate)
+    "country":           pa.string(),
+    "date":              pa.string(),
+}
+SCHEMA = pa.schema(list(COLUMNS.items()))
+
+
+def to_table(df: pd.DataFrame) -> pa.Table:
+    """
+    Convierte la salida de process_data.py al esquema del dataset. Las columnas que falten
+    se rellenan con nulos y las sobrantes se descartan.
+    """
+    out = {}
+    for col, typ in COLUMNS.items():
+        s = df[col] if col in df.columns else pd.Series(None, index=df.index, dtype=object)
+        if pa.types.is_string(typ):
+            s = s.astype(object).where(s.notna(), None).map(lambda v: v if v is None else str(v))
+        else:
+            s = pd.to_numeric(s, errors="coerce")
+            if pa.types.is_integer(typ):
+                s = s.round().astype("Int64")
+        out[col] = pa.array(s, type=typ, from_pandas=True)
+    return pa.table(out, schema=SCHEMA)
+
+
+def partition_dir(country: str, date: str) -> str:
+    """Directorio relativo de una partición (con el mismo escapado que usa pyarrow)."""
+    return PARTITIONING.format((ds.field("country") == str(country)) & (ds.field("date") == str(date)))[0]
+
+
+def write(df: pd.DataFrame, path: str = DATASET_PATH, partitions=None) -> int:
+    """
+    Escribe las filas en sus particiones (país, fecha). Las particiones que aparecen en `df`
+    se reemplazan enteras, así que relanzar un merge es idempotente; el resto no se toca.
+    `partitions`: pares (país, fecha) de la entrada del merge; las que no tengan filas en
+    `df` (p.ej. un día que ya no empareja ninguna canción) se borran en vez de quedarse
+    con el resultado anterior. Devuelve el número de particiones escritas.
+    """
+    present = set() if df.empty else set(zip(df["country"].astype(str), df["date"].astype(str)))
+    for country, date in {(str(c), str(d)) for c, d in (partitions or ())} - present:
+        part = os.path.join(path, partition_dir(country, date))
+        shutil.rmtree(part, ignore_errors=True)
+        try:
+            os.rmdir(os.path.dirname(part))  # country=... si se ha quedado vacío
+        except OSError:
+            pass
+    if df.empty:
+        return 0
+    ds.write_dataset(
+        to_table(df), path, format="parquet", partitioning=PARTITIONING,
+        existing_data_behavior="delete_matching", basename_template="part-{i}.parquet",
+    )
+    return int(df[["country", "date"]].drop_duplicates().shape[0])
+
+
+def exists(path: str = DATASET_PATH) -> bool:
+    return bool(glob.glob(os.path.join(path, "*", "*", "*.parquet")))
+
+
+def _filter(countries=None, dates=None, start: str | None = None, end: str | None = None, partitions=None):
+    expr = None
+    pairs = None
+    for c, d in (partitions or []):
+        cond = (ds.field("country") == c) & (ds.field("date") == d)
+        pairs = cond if pairs is None else pairs | cond
+    for cond in (
+        pairs,
+        ds.field("country").isin(list(countries)) if countries else None,
+        ds.field("date").isin(list(dates)) if dates else None,
+        ds.field("date") >= start if start else None,
+        ds.field("date") <= end if end else None,
+    ):
+        if cond is not None:
+            expr = cond if expr is None else expr & cond
+    return expr
+
+
+def read(path: str = DATASET_PATH, countries=None, dates=None, start: str | None = None, end: str | None = None,
+         columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    Lee el dataset como DataFrame. Los filtros por país/fecha se aplican sobre las
+    particiones, así que sólo se abren los ficheros de los días/países pedidos.
+    """
+    if not exists(path):
+        return pd.DataFrame(columns=columns or list(COLUMNS))
+    dataset = ds.dataset(path, format="parquet", partitioning=PARTITIONING)
+    return dataset.to_table(columns=columns, filter=_filter(countries, dates, start, end)).to_pandas()
+
+
+def count(path: str = DATASET_PATH, partitions=None) -> int:
+    """
+    Filas del dataset; con `partitions` (pares (país, fecha)), sólo las de esas particiones.
+    Se cuentan desde los metadatos de Parquet, sin leer las columnas.
+    """
+    if not exists(path) or (partitions is not None and not partitions):
+        return 0
+    dataset = ds.dataset(path, format="parquet", partitioning=PARTITIONING)
+    return dataset.count_rows(filter=_filter(partitions=partitions))
+
+
+def files(path: str = DATASET_PATH) -> list[str]:
+    """Ficheros del dataset (para firmas de recarga por mtime)."""
+    return sorted(glob.glob(os.path.join(path, "*", "*", "*.parquet")))
+
+
+def from_csv(pattern: str = CSV_PATTERN, path: str = DATASET_PATH) -> int:
+    """
+    Migra los CSV procesados antiguos ({CC}_mood_{date}.csv) al dataset. n_chart se toma
+    del CSV de metadatos correspondiente en data/interim, como hacía summarize.py.
+    """
+    from summarize import infer_metadata_path
+
+    frames = []
+    for p in sorted(glob.glob(pattern)):
+        if not re.match(r"^[A-Za-z]{2}_mood_\d{4}-\d{2}-\d{2}\.csv$", Path(p).name):
+            continue
+        df = pd.read_csv(p)
+        if df.empty or not {"country", "date"}.issubset(df.columns):
+            continue
+        meta = infer_metadata_path(p)
+        if "n_chart" not in df.columns and meta:
+            with open(meta, "rb") as f:
+                df["n_chart"] = max(sum(1 for _ in f) - 1, 0)
+        frames.append(df)
+    if not frames:
+        return 0
+    return write(pd.concat(frames, ignore_index=True, sort=False), path)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Convert processed CSVs into the partitioned Parquet dataset (country/date).")
+    ap.add_argument("--input", default=CSV_PATTERN, help="Glob of processed CSVs (from process_data.py --out)")
+    ap.add_argument("--dataset", default=DATASET_PATH)
+    args = ap.parse_args()
+
+    n = from_csv(args.input, args.dataset)
+    if not n:
+        print("⚠️ No processed CSVs found.")
+        return
+    print(f"✅ Wrote {n} partitions to {args.dataset}")
+
+
+if __name__ == "__main__":
+    main()
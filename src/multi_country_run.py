@@ -1,7 +1,13 @@
+import argparse
 import subprocess
 from pathlib import Path
 import sys
 
+import pandas as pd
+
+import mood_dataset
+from profiling import RunReport, StageRunner, count_rows
+
 # === Configuración de Países y Fechas ===
 # Estrategia para el paper:
 # 1. Europa (ES, FR, DE, GB) vs América (US, BR) vs Asia/Oceanía (JP, AU)
@@ -43,6 +49,16 @@ def run(cmd):
     subprocess.run(cmd, check=True)
 
 def main():
+    ap = argparse.ArgumentParser(description="Run select → fetch for every task in TASKS, one batch merge into the processed dataset "
+                                             "(and optionally summarize/render).")
+    ap.add_argument("--summarize", action="store_true", help="Run summarize.py at the end")
+    ap.add_argument("--render", action="store_true", help="Run visualize_countries.py at the end")
+    ap.add_argument("--tracemalloc", type=int, default=0, help="Record the top-N allocation sites per stage (slower)")
+    ap.add_argument("--cprofile", action="store_true", help="Write a cProfile dump per stage next to the run report")
+    ap.add_argument("--in-process", action="store_true",
+                    help="Run every stage in this interpreter (imports paid once instead of per stage; peak memory becomes cumulative)")
+    args = ap.parse_args()
+
     # Crear directorios necesarios
     Path("data/raw").mkdir(parents=True, exist_ok=True)
     Path("data/interim").mkdir(parents=True, exist_ok=True)
@@ -65,42 +81,75 @@ def main():
             print(f"❌ Error: Falta {raw_feats}. No se puede generar el dataset limpio.")
             return
 
+    # Informe por ejecución: tiempo, CPU, memoria y filas de cada etapa
+    report = RunReport()
+    stages = StageRunner(report, PY, tracemalloc_top=args.tracemalloc, cprofile=args.cprofile, in_process=args.in_process)
+
     print(f"🚀 Iniciando procesamiento para {len(TASKS)} tareas...")
 
-    for t in TASKS:
-        cc = t["cc"]; cn = t["country"]; date = t["date"]; top = str(t["top"])
-
-        sample_csv = f"data/raw/{cc}_sample_{date}.csv"
-        meta_csv   = f"data/interim/{cc}_metadata_{date}.csv"
-        out_csv    = f"data/processed/{cc}_mood_{date}.csv"
-
-        print(f"\n--- Procesando: {cn} ({date}) ---")
-
-        # 1) Select Top-N from charts
-        # Si el fichero ya existe, podríamos saltarlo, pero mejor regenerar para asegurar consistencia
-        run([PY, "src/select_from_charts.py",
-             "--input", CHARTS_PATH,
-             "--country", cc,
-             "--date", date,
-             "--top", top,
-             "--out", sample_csv])
-
-        # 2) Enrich via API (Metadata)
-        # Este es el paso lento (rate limits).
-        run([PY, "src/fetch_metadata.py",
-             "--chart", sample_csv,
-             "--country", cn,
-             "--date", date,
-             "--out", meta_csv])
-
-        # 3) Merge + MoodIndex
-        run([PY, "src/process_data.py",
-             "--meta", meta_csv,
-             "--features", FEATURES_CLEAN,
-             "--out", out_csv])
+    meta_csvs = []
+    partitions = []
+    empty = []
+    try:
+        for t in TASKS:
+            cc = t["cc"]; cn = t["country"]; date = t["date"]; top = str(t["top"])
+
+            sample_csv = f"data/raw/{cc}_sample_{date}.csv"
+            meta_csv   = f"data/interim/{cc}_metadata_{date}.csv"
+
+            print(f"\n--- Procesando: {cn} ({date}) ---")
+
+            # 1) Select Top-N from charts
+            # Si el fichero ya existe, podríamos saltarlo, pero mejor regenerar para asegurar consistencia
+            stages.run([PY, "src/select_from_charts.py",
+                        "--input", CHARTS_PATH,
+                        "--country", cc,
+                        "--date", date,
+                        "--top", top,
+                        "--out", sample_csv],
+                       "select", rows_in=CHARTS_PATH, rows_out=sample_csv, cc=cc, date=date)
+
+            # 2) Enrich via API (Metadata)
+            # Este es el paso lento (rate limits).
+            fetch = stages.run([PY, "src/fetch_metadata.py",
+                                "--chart", sample_csv,
+                                "--country", cn,
+                                "--date", date,
+                                "--out", meta_csv],
+                               "fetch", rows_in=sample_csv, rows_out=meta_csv, cc=cc, date=date)
+            # Si no se resolvió ninguna canción, fetch_metadata no escribe el CSV: no se
+            # mezcla (ni un fichero de una ejecución anterior) para no tumbar el merge en lote
+            if not fetch["output_written"]:
+                print(f"⚠️ Sin metadatos para {cn} ({date}); se omite del merge.")
+                empty.append((cn, date))
+                continue
+            meta_csvs.append(meta_csv)
+            partitions.append((cn, date))
+
+        # 3) Merge + MoodIndex: un único merge de todas las tareas contra las features,
+        # escrito en el dataset particionado data/processed/mood_dataset/country=.../date=...
+        # rows_in = filas de metadatos de todas las tareas; rows_out = filas en sus particiones
+        if meta_csvs:
+            stages.run([PY, "src/process_data.py",
+                        "--meta", *meta_csvs,
+                        "--features", FEATURES_CLEAN],
+                       "merge", rows_in=sum(count_rows(p) or 0 for p in meta_csvs),
+                       rows_out=lambda: mood_dataset.count(mood_dataset.DATASET_PATH, partitions))
+        else:
+            print("⚠️ Ninguna tarea produjo metadatos; no hay nada que mezclar.")
+        # las tareas sin metadatos no deben conservar la partición de una ejecución anterior
+        mood_dataset.write(pd.DataFrame(), mood_dataset.DATASET_PATH, partitions=empty)
+
+        if args.summarize:
+            stages.run([PY, "src/summarize.py"], "summarize", rows_out="data/processed/country_summary.csv")
+        if args.render:
+            stages.run([PY, "src/visualize_countries.py"], "render", rows_in="data/processed/country_summary.csv")
+    finally:
+        print(f"\n📊 Run report: {report.save()}")
 
     print("\n✅ Ejecución multi-país completada.")
-    print("   Ahora ejecuta: python src/summarize.py para actualizar el resumen global.")
+    if not args.summarize:
+        print("   Ahora ejecuta: python src/summarize.py para actualizar el resumen global.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,4 +1,5 @@
 import argparse
+import glob
 import pandas as pd
 import numpy as np
 import unicodedata
@@ -40,15 +41,27 @@ def norm_text(s: str) -> str:
     return s
 
 
-def merge_and_compute_mood(metadata_path: str, features_path: str) -> pd.DataFrame:
+def merge_and_compute_mood(metadata_path: str | list[str], features_path: str) -> pd.DataFrame:
+    """
+    Une uno o varios CSV de metadatos (p.ej. todos los países/días de una ejecución) con
+    las audio features en un único merge: las features se leen y normalizan una sola vez.
+    """
+    paths = [metadata_path] if isinstance(metadata_path, str) else list(metadata_path)
     print("📥 Loading input files...")
-    meta = pd.read_csv(metadata_path)
+    metas = []
+    for p in paths:
+        m = pd.read_csv(p)
+        m.columns = [c.strip().lower() for c in m.columns]
+        metas.append(m)
+    meta = pd.concat(metas, ignore_index=True, sort=False) if len(metas) > 1 else metas[0]
     feats = pd.read_csv(features_path)
-
-    meta.columns = [c.strip().lower() for c in meta.columns]
     feats.columns = [c.strip().lower() for c in feats.columns]
 
-    print(f"✅ Metadata: {len(meta)} rows, Audio features: {len(feats)} rows")
+    print(f"✅ Metadata: {len(meta)} rows ({len(paths)} files), Audio features: {len(feats)} rows")
+
+    # Tamaño del chart por (país, fecha), para la tasa de emparejamiento en summarize.py
+    if {"country", "date"}.issubset(meta.columns):
+        meta["n_chart"] = meta.groupby(["country", "date"])["country"].transform("size")
 
     # ---------- 1) Merge por track_id ----------
     merged_id = pd.DataFrame()
@@ -116,6 +129,7 @@ def merge_and_compute_mood(metadata_path: str, features_path: str) -> pd.DataFra
         "valence", "energy", "danceability", "tempo",
         "mood_index", "track_popularity", "artist_popularity", "artist_genres",
         "streams_chart",  # si no existe, se ignorará más abajo
+        "n_chart",
     ]
     keep_cols = [c for c in pick if c in merged.columns]
     merged = merged[keep_cols].rename(columns={
@@ -127,22 +141,52 @@ def merge_and_compute_mood(metadata_path: str, features_path: str) -> pd.DataFra
     return merged
 
 
+def meta_partitions(paths: list[str]) -> set[tuple[str, str]]:
+    """Pares (país, fecha) presentes en los CSV de metadatos, aunque el merge no empareje nada."""
+    keys = set()
+    for p in paths:
+        meta = pd.read_csv(p, usecols=lambda c: c in {"country", "date"}, dtype=str)
+        if {"country", "date"}.issubset(meta.columns):
+            meta = meta.dropna()
+            keys.update(zip(meta["country"], meta["date"]))
+    return keys
+
+
 def main():
+    # pyarrow sólo hace falta al escribir; norm_text se importa desde otros módulos
+    import mood_dataset
+    from mood_dataset import DATASET_PATH
+
     ap = argparse.ArgumentParser(
         description="Merge Spotify metadata with audio features (ID + name fallback), compute Mood Index, and show streams-weighted mean if available."
     )
-    ap.add_argument("--meta", required=True, help="Path to metadata CSV (from fetch_metadata.py)")
+    ap.add_argument("--meta", required=True, nargs="+",
+                    help="Metadata CSV(s) from fetch_metadata.py; several files or globs are merged in one pass")
     ap.add_argument("--features", required=True, help="Path to audio features CSV (from load_public_data.py)")
-    ap.add_argument("--out", required=True, help="Output CSV file path")
+    ap.add_argument("--dataset", default=DATASET_PATH, help="Partitioned Parquet dataset (country/date) to write into")
+    ap.add_argument("--no-dataset", action="store_true", help="Do not write the Parquet dataset")
+    ap.add_argument("--out", help="Also write all merged rows to this CSV")
     args = ap.parse_args()
-
-    df = merge_and_compute_mood(args.meta, args.features)
+    if args.no_dataset and not args.out:
+        ap.error("--no-dataset requires --out")
+
+    paths = [p for pattern in args.meta for p in (sorted(glob.glob(pattern)) or [pattern])]
+    df = merge_and_compute_mood(paths, args.features)
+    # Las particiones de todos los (país, fecha) de la entrada se reemplazan, también las
+    # que ahora quedan sin filas
+    partitions = set() if args.no_dataset else meta_partitions(paths)
     if df.empty:
+        if partitions:
+            mood_dataset.write(df, args.dataset, partitions=partitions)
         print("❌ No data to save (merge produced 0 rows).")
         return
 
-    df.to_csv(args.out, index=False)
-    print(f"💾 Saved processed data to: {args.out}")
+    if not args.no_dataset:
+        n = mood_dataset.write(df, args.dataset, partitions=partitions)
+        print(f"💾 Saved processed data to: {args.dataset} ({n} country/date partitions)")
+    if args.out:
+        df.to_csv(args.out, index=False)
+        print(f"💾 Saved processed data to: {args.out}")
 
 
 if __name__ == "__main__":
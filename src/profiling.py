@@ -0,0 +1,296 @@
+import argparse
+import cProfile
+import json
+import os
+import platform
+import runpy
+import subprocess
+import sys
+import time
+import traceback
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource  # no existe en Windows
+except ImportError:
+    resource = None
+
+REPORT_DIR = "data/reports"
+
+
+def peak_rss_mb() -> float | None:
+    """Pico de memoria residente del proceso actual (MB), o None si no se puede medir."""
+    # En Linux, ru_maxrss se hereda del padre a través de fork/exec; VmHWM no
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux devuelve KB, macOS bytes
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+_row_cache: dict[tuple, int] = {}
+
+
+def count_rows(path: str) -> int | None:
+    """
+    Filas de datos de un CSV (líneas − cabecera), contando saltos de línea en bloques
+    binarios. Se memoriza por (ruta, mtime, tamaño): el CSV de charts se cuenta una vez.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (path, st.st_mtime_ns, st.st_size)
+    if key not in _row_cache:
+        n, last = 0, b"\n"
+        with open(path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                n += chunk.count(b"\n")
+                last = chunk[-1:]
+        if last != b"\n":
+            n += 1
+        _row_cache[key] = max(n - 1, 0)
+    return _row_cache[key]
+
+
+def _stat_sig(path: str) -> tuple | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def _rows(spec) -> int | None:
+    """Filas para el informe a partir de una ruta CSV, un entero o una función."""
+    if spec is None:
+        return None
+    if isinstance(spec, int):
+        return spec
+    if callable(spec):
+        return spec()
+    return count_rows(spec)
+
+
+def git_commit(cwd: str | None = None) -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=cwd, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_script(script: str, argv: list[str], tracemalloc_top: int = 0, cprofile_out: str | None = None) -> dict:
+    """
+    Ejecuta un script del pipeline en este mismo proceso (como `python script.py argv...`)
+    y mide tiempo de pared, CPU, pico de RSS y, opcionalmente, los principales puntos de
+    asignación de memoria (tracemalloc) y un volcado de cProfile.
+    """
+    sys.argv = [script, *argv]
+    script_dir = str(Path(script).resolve().parent)
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+    if tracemalloc_top:
+        tracemalloc.start()
+    prof = cProfile.Profile() if cprofile_out else None
+
+    exit_code = 0
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    try:
+        if prof:
+            prof.enable()
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception:
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        if prof:
+            prof.disable()
+    rec = {
+        "wall_s": round(time.perf_counter() - wall0, 4),
+        "cpu_s": round(time.process_time() - cpu0, 4),
+        "peak_rss_mb": peak_rss_mb(),
+        "exit_code": exit_code,
+    }
+
+    if tracemalloc_top:
+        snap = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rec["tracemalloc_peak_mb"] = round(peak / (1024 * 1024), 2)
+        rec["top_allocators"] = [
+            {"where": f"{s.traceback[0].filename}:{s.traceback[0].lineno}", "size_kb": round(s.size / 1024, 1), "count": s.count}
+            for s in snap.statistics("lineno")[:tracemalloc_top]
+        ]
+    if prof:
+        Path(cprofile_out).parent.mkdir(parents=True, exist_ok=True)
+        prof.dump_stats(cprofile_out)
+        rec["cprofile"] = cprofile_out
+    return rec
+
+
+class RunReport:
+    """
+    Informe JSON de una ejecución del pipeline: una entrada por etapa con tiempos,
+    memoria y filas de entrada/salida.
+
+        report = RunReport()
+        report.add_stage("select", record, rows_in=..., rows_out=..., cc="ES", date="2017-08-01")
+        report.save()
+    """
+
+    def __init__(self, report_dir: str = REPORT_DIR):
+        self.started = datetime.now()
+        self.run_id = self.started.strftime("%Y%m%d-%H%M%S")
+        self.path = str(Path(report_dir) / f"run_{self.run_id}.json")
+        self.stages: list[dict] = []
+        self.meta = {
+            "run_id": self.run_id,
+            "started_at": self.started.isoformat(timespec="seconds"),
+            "argv": sys.argv,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "git_commit": git_commit(),
+        }
+
+    def add_stage(self, stage: str, record: dict, rows_in: int | None = None, rows_out: int | None = None,
+                  output_written: bool | None = None, **labels) -> dict:
+        entry = {"stage": stage, **labels, "rows_in": rows_in, "rows_out": rows_out}
+        if output_written is not None:
+            entry["output_written"] = output_written
+        entry.update(record)
+        self.stages.append(entry)
+        return entry
+
+    def totals(self) -> dict:
+        by_stage: dict[str, dict] = {}
+        for s in self.stages:
+            t = by_stage.setdefault(s["stage"], {"runs": 0, "wall_s": 0.0, "cpu_s": 0.0, "peak_rss_mb": None})
+            t["runs"] += 1
+            t["wall_s"] = round(t["wall_s"] + s.get("wall_s", 0.0), 4)
+            t["cpu_s"] = round(t["cpu_s"] + s.get("cpu_s", 0.0), 4)
+            if s.get("peak_rss_mb") is not None:
+                t["peak_rss_mb"] = max(t["peak_rss_mb"] or 0.0, s["peak_rss_mb"])
+        return by_stage
+
+    def save(self) -> str:
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        body = {
+            **self.meta,
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "wall_s": round((datetime.now() - self.started).total_seconds(), 3),
+            "totals": self.totals(),
+            "stages": self.stages,
+        }
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(body, f, indent=2)
+        # carpeta de registros temporales / volcados de cProfile de la ejecución
+        try:
+            os.rmdir(Path(self.path).with_suffix(""))
+        except OSError:
+            pass
+        return self.path
+
+
+class StageRunner:
+    """
+    Lanza cada etapa como subproceso bajo este mismo módulo (`python src/profiling.py ...`),
+    de modo que las medidas son sólo de esa etapa, y añade el resultado al RunReport.
+
+    Con in_process=True las etapas se ejecutan en este intérprete: pandas/spotipy/etc. se
+    importan una sola vez para toda la ejecución en lugar de una vez por etapa. A cambio,
+    peak_rss_mb pasa a ser el pico acumulado del proceso.
+    """
+
+    def __init__(self, report: RunReport, python: str = sys.executable, tracemalloc_top: int = 0, cprofile: bool = False,
+                 in_process: bool = False):
+        self.report = report
+        self.python = python
+        self.tracemalloc_top = tracemalloc_top
+        self.cprofile = cprofile
+        self.in_process = in_process
+        self._n = 0
+
+    def run(self, cmd: list[str], stage: str, rows_in=None, rows_out=None, **labels) -> dict:
+        """
+        cmd = [python, script, args...]. rows_in/rows_out: CSVs cuyas filas se cuentan
+        para el informe, un número ya contado o una función que lo devuelve (se llama al
+        terminar la etapa, p.ej. para contar filas escritas en el dataset Parquet).
+        Si rows_out es un CSV que la etapa no ha (re)escrito, se registra rows_out=0 y
+        output_written=False en vez de contar un fichero de una ejecución anterior.
+        Devuelve la entrada del informe. Lanza CalledProcessError si la etapa falla
+        (tras registrarla).
+        """
+        print(">>", " ".join(cmd))
+        out_path = rows_out if isinstance(rows_out, str) else None
+        out_before = _stat_sig(out_path) if out_path else None
+        self._n += 1
+        tag = "_".join([f"{self._n:03d}", stage, *[str(v) for v in labels.values()]])
+        record_path = str(Path(self.report.path).with_suffix("") / f"{tag}.json")
+        prof_path = str(Path(record_path).with_suffix(".prof")) if self.cprofile else None
+
+        if self.in_process:
+            argv0 = sys.argv
+            try:
+                rec = run_script(cmd[1], cmd[2:], self.tracemalloc_top, prof_path)
+            finally:
+                sys.argv = argv0
+            returncode = rec["exit_code"]
+        else:
+            wrapped = [self.python, str(Path(__file__).resolve()), "--record", record_path]
+            if self.tracemalloc_top:
+                wrapped += ["--tracemalloc", str(self.tracemalloc_top)]
+            if prof_path:
+                wrapped += ["--cprofile", prof_path]
+            returncode = subprocess.run(wrapped + cmd[1:]).returncode
+            try:
+                with open(record_path, encoding="utf-8") as f:
+                    rec = json.load(f)
+                os.remove(record_path)
+            except (OSError, ValueError):
+                rec = {"exit_code": returncode}
+        written = None
+        if out_path:
+            after = _stat_sig(out_path)
+            written = after is not None and after != out_before
+        entry = self.report.add_stage(
+            stage, rec,
+            rows_in=_rows(rows_in),
+            rows_out=_rows(rows_out) if written is not False else 0,
+            output_written=written,
+            **labels,
+        )
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, cmd)
+        return entry
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run one pipeline script under instrumentation and write its stage record as JSON.")
+    ap.add_argument("--record", required=True, help="Output JSON for this stage's measurements")
+    ap.add_argument("--tracemalloc", type=int, default=0, help="Record the top-N allocation sites (0 = off)")
+    ap.add_argument("--cprofile", help="Write a cProfile dump (.prof) to this path")
+    ap.add_argument("script", help="Pipeline script, e.g. src/select_from_charts.py")
+    ap.add_argument("args", nargs=argparse.REMAINDER, help="Arguments for the script")
+    args = ap.parse_args()
+
+    rec = run_script(args.script, args.args, args.tracemalloc, args.cprofile)
+    Path(args.record).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.record, "w", encoding="utf-8") as f:
+        json.dump(rec, f)
+    sys.exit(rec["exit_code"])
+
+
+if __name__ == "__main__":
+    main()
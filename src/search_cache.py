@@ -0,0 +1,94 @@
+import sqlite3
+import time
+import unicodedata
+from pathlib import Path
+from typing import Optional
+
+from process_data import norm_text
+
+SEARCH_CACHE_PATH = "data/interim/search_cache.sqlite"
+
+# Un acierto (track_id) es estable; un "no encontrado" puede dejar de serlo
+# (catálogo nuevo, metadatos corregidos), así que caduca antes.
+TTL_HIT_DAYS = 90
+TTL_MISS_DAYS = 7
+
+
+def _key_part(s: str) -> str:
+    # Mismas reglas que el name-merge de process_data.py. norm_text deja vacíos los
+    # nombres sin caracteres latinos (米津玄師, 아이유, Звери): en ese caso se usa el texto
+    # tal cual (NFKC, minúsculas, espacios compactados) para no mezclar canciones.
+    n = norm_text(s)
+    if n:
+        return n
+    return " ".join(unicodedata.normalize("NFKC", "" if s is None else str(s)).lower().split())
+
+
+def cache_key(track_name: str, artist_name: str) -> Optional[str]:
+    """Clave de caché, o None si algún nombre está vacío (no se cachea)."""
+    t, a = _key_part(track_name), _key_part(artist_name)
+    if not t or not a:
+        return None
+    return f"{t}|{a}"
+
+
+class SearchCache:
+    """
+    Caché persistente (SQLite) de resoluciones nombre → track_id de sp.search.
+    Guarda aciertos y también negativos ("no encontrado", track_id NULL) con TTL distintos.
+
+        cache = SearchCache()
+        hit, track_id = cache.get("Despacito - Remix", "Luis Fonsi & Daddy Yankee")
+        if not hit:
+            ...  # buscar en la API
+            cache.put("Despacito - Remix", "Luis Fonsi & Daddy Yankee", track_id_or_none)
+    """
+
+    def __init__(self, path: str = SEARCH_CACHE_PATH, ttl_hit_days: float = TTL_HIT_DAYS,
+                 ttl_miss_days: float = TTL_MISS_DAYS):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_hit = ttl_hit_days * 86400
+        self.ttl_miss = ttl_miss_days * 86400
+        # timeout alto + WAL: varios procesos de multi_country_run pueden compartir el fichero
+        self._conn = sqlite3.connect(path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_cache ("
+            " key TEXT PRIMARY KEY,"
+            " track_id TEXT,"
+            " resolved_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, track_name: str, artist_name: str) -> tuple[bool, Optional[str]]:
+        """
+        Devuelve (en_caché, track_id). track_id es None si la entrada es un negativo.
+        Las entradas caducadas cuentan como no cacheadas.
+        """
+        key = cache_key(track_name, artist_name)
+        row = None if key is None else self._conn.execute(
+            "SELECT track_id, resolved_at FROM search_cache WHERE key = ?", (key,),
+        ).fetchone()
+        if row is not None:
+            track_id, resolved_at = row
+            ttl = self.ttl_hit if track_id is not None else self.ttl_miss
+            if time.time() - resolved_at < ttl:
+                self.hits += 1
+                return True, track_id
+        self.misses += 1
+        return False, None
+
+    def put(self, track_name: str, artist_name: str, track_id: Optional[str]):
+        key = cache_key(track_name, artist_name)
+        if key is None:
+            return
+        self._conn.execute(
+            "INSERT OR REPLACE INTO search_cache (key, track_id, resolved_at) VALUES (?, ?, ?)",
+            (key, track_id, time.time()),
+        )
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,241 @@
+import argparse
+import glob
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+import mood_dataset
+
+SUMMARY_PATH = "data/processed/country_summary.csv"
+PROCESSED_PATTERN = "data/processed/*_mood_*.csv"
+
+
+def _clean(v):
+    # NaN/NaT no son JSON válido: se devuelven como null
+    if isinstance(v, float) and math.isnan(v):
+        return None
+    return v
+
+
+def _records(df: pd.DataFrame) -> list[dict]:
+    return [{k: _clean(v) for k, v in row.items()} for row in df.to_dict(orient="records")]
+
+
+class LRUCache:
+    """
+    Caché LRU de respuestas ya serializadas (clave = ruta + query string).
+    `generation` aumenta en cada clear(): una respuesta calculada con los datos de antes de
+    una recarga (put con una generación anterior) se descarta en vez de quedarse en caché.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            body = self._data.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: str, body: bytes, generation: int | None = None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = body
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.generation += 1
+
+
+class MoodStore:
+    """
+    Datos en memoria: métricas por (país, fecha) desde country_summary.csv y filas por
+    canción desde el dataset procesado (o, si no existe, desde los CSV). Se recarga sólo si cambia la firma (mtime + tamaño)
+    de los ficheros, comprobada como mucho cada `check_interval` segundos.
+    """
+
+    def __init__(self, summary_path: str = SUMMARY_PATH, processed_pattern: str = PROCESSED_PATTERN,
+                 check_interval: float = 2.0, cache_size: int = 1024, dataset_path: str = mood_dataset.DATASET_PATH):
+        self.summary_path = summary_path
+        self.processed_pattern = processed_pattern
+        self.dataset_path = dataset_path
+        self.check_interval = check_interval
+        self.cache = LRUCache(cache_size)
+        self._lock = threading.Lock()
+        self._signature = None
+        self._last_check = 0.0
+        self.metrics: dict[tuple[str, str], dict] = {}
+        self.tracks: dict[tuple[str, str], list[dict]] = {}
+        self.loaded_at = None
+        self.maybe_reload(force=True)
+
+    def _current_signature(self) -> tuple:
+        paths = [self.summary_path] + mood_dataset.files(self.dataset_path) + sorted(glob.glob(self.processed_pattern))
+        sig = []
+        for p in paths:
+            try:
+                st = os.stat(p)
+                sig.append((p, st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                continue
+        return tuple(sig)
+
+    def maybe_reload(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return
+        with self._lock:
+            self._last_check = now
+            sig = self._current_signature()
+            if sig == self._signature:
+                return
+            self._load(sig)
+
+    def _load(self, sig: tuple):
+        metrics: dict[tuple[str, str], dict] = {}
+        if os.path.exists(self.summary_path):
+            for row in _records(pd.read_csv(self.summary_path)):
+                metrics[(str(row["country"]), str(row["date"]))] = row
+
+        tracks: dict[tuple[str, str], list[dict]] = {}
+        if mood_dataset.exists(self.dataset_path):
+            frames = [mood_dataset.read(self.dataset_path).drop(columns=["n_chart"])]
+        else:
+            frames = (pd.read_csv(p) for p in glob.glob(self.processed_pattern))
+        for df in frames:
+            if df.empty or not {"country", "date"}.issubset(df.columns):
+                continue
+            for (country, date), g in df.groupby(["country", "date"]):
+                tracks.setdefault((str(country), str(date)), []).extend(_records(g))
+
+        # swap atómico de referencias + invalidar caché de respuestas
+        self.metrics, self.tracks = metrics, tracks
+        self._signature = sig
+        self.loaded_at = time.time()
+        self.cache.clear()
+        print(f"🔄 Loaded {len(metrics)} country-days and {len(tracks)} track lists")
+
+    def query_metrics(self, country: str | None, date: str | None) -> list[dict]:
+        return [
+            row for (c, d), row in sorted(self.metrics.items())
+            if (country is None or c == country) and (date is None or d == date)
+        ]
+
+    def query_tracks(self, country: str, date: str) -> list[dict]:
+        return self.tracks.get((country, date), [])
+
+    def countries(self) -> list[str]:
+        return sorted({c for c, _ in self.metrics} | {c for c, _ in self.tracks})
+
+
+class MoodHandler(BaseHTTPRequestHandler):
+    """
+    Endpoints (sólo lectura, JSON):
+      GET /health
+      GET /countries
+      GET /metrics?country=Spain&date=2017-08-01   (ambos filtros opcionales)
+      GET /tracks?country=Spain&date=2017-08-01    (ambos obligatorios)
+    """
+
+    protocol_version = "HTTP/1.1"  # keep-alive para los clientes de carga
+    disable_nagle_algorithm = True  # cabeceras y cuerpo van en dos send(): evita el retardo de ~40 ms
+    store: MoodStore = None
+
+    def log_message(self, format, *args):
+        pass  # sin log por petición: distorsiona las medidas de latencia
+
+    def _send(self, status: int, body: bytes, cache: str = "MISS"):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-Cache", cache)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, msg: str):
+        self._send(status, json.dumps({"error": msg}).encode("utf-8"))
+
+    def do_GET(self):
+        store = self.store
+        store.maybe_reload()
+
+        parts = urlsplit(self.path)
+        if parts.path == "/health":
+            body = {"status": "ok", "loaded_at": store.loaded_at,
+                    "cache_hits": store.cache.hits, "cache_misses": store.cache.misses}
+            return self._send(200, json.dumps(body).encode("utf-8"), cache="BYPASS")
+
+        cached = store.cache.get(self.path)
+        if cached is not None:
+            return self._send(200, cached, cache="HIT")
+        # antes de leer los datos: si entretanto hay una recarga, esta respuesta no se cachea
+        generation = store.cache.generation
+
+        q = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        if parts.path == "/countries":
+            payload = store.countries()
+        elif parts.path == "/metrics":
+            payload = store.query_metrics(q.get("country"), q.get("date"))
+        elif parts.path == "/tracks":
+            if "country" not in q or "date" not in q:
+                return self._error(400, "'country' and 'date' are required")
+            payload = store.query_tracks(q["country"], q["date"])
+        else:
+            return self._error(404, f"Unknown endpoint: {parts.path}")
+
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        store.cache.put(self.path, body, generation)
+        self._send(200, body)
+
+
+def make_server(host: str, port: int, store: MoodStore) -> ThreadingHTTPServer:
+    handler = type("BoundMoodHandler", (MoodHandler,), {"store": store})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local read-only HTTP service for mood metrics and per-track rows (JSON).")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--summary", default=SUMMARY_PATH, help="Summary CSV (from summarize.py)")
+    ap.add_argument("--dataset", default=mood_dataset.DATASET_PATH, help="Processed dataset (from process_data.py)")
+    ap.add_argument("--processed", default=PROCESSED_PATTERN, help="Glob of processed CSVs, used if --dataset does not exist")
+    ap.add_argument("--cache-size", type=int, default=1024, help="Max cached responses (LRU)")
+    ap.add_argument("--reload-interval", type=float, default=2.0, help="Seconds between file change checks")
+    args = ap.parse_args()
+
+    store = MoodStore(args.summary, args.processed, check_interval=args.reload_interval, cache_size=args.cache_size,
+                      dataset_path=args.dataset)
+    server = make_server(args.host, args.port, store)
+    print(f"🚀 Serving on http://{args.host}:{args.port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
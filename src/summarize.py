@@ -1,3 +1,4 @@
+import argparse
 import pandas as pd
 import numpy as np
 from pathlib import Path
@@ -5,6 +6,10 @@ import glob
 import os
 import re
 
+import mood_dataset
+from mood_cube import build_cube, CUBE_PATH
+from mood_dataset import DATASET_PATH
+
 IN_PATTERN = "data/processed/*_mood_*.csv"
 OUT_PATH   = "data/processed/country_summary.csv"
 
@@ -38,11 +43,7 @@ def summarize_file(path):
         if col not in df.columns:
             return None
 
-    country = str(df["country"].iloc[0])
-    date    = str(df["date"].iloc[0])
-
     # coverage
-    n_matched = int(len(df))
     meta_path = infer_metadata_path(path)
     if meta_path:
         try:
@@ -52,7 +53,14 @@ def summarize_file(path):
     else:
         n_chart = np.nan
 
-    match_rate = float(n_matched / n_chart) if isinstance(n_chart, (int, float)) and n_chart and n_chart > 0 else np.nan
+    return summarize_frame(df, n_chart)
+
+def summarize_frame(df: pd.DataFrame, n_chart=np.nan):
+    """Métricas de un país/día a partir de sus filas procesadas (una por canción emparejada)."""
+    country = str(df["country"].iloc[0])
+    date    = str(df["date"].iloc[0])
+    n_matched = int(len(df))
+    match_rate = float(n_matched / n_chart) if pd.notna(n_chart) and n_chart > 0 else np.nan
 
     # mood stats
     mood = pd.to_numeric(df["mood_index"], errors="coerce").dropna()
@@ -89,21 +97,61 @@ def summarize_file(path):
         "w_mean_pop": w_mean_pop, "w_mean_streams": w_mean_streams
     }
 
+def summarize_dataset(path: str = DATASET_PATH, countries=None, start: str | None = None,
+                      end: str | None = None) -> list[dict]:
+    """Una fila de métricas por país/día del dataset particionado."""
+    # un solo escaneo columnar; los filtros por país/fecha descartan particiones enteras
+    df = mood_dataset.read(path, countries=countries, start=start, end=end,
+                           columns=["country", "date", "mood_index", "track_popularity", "streams_chart", "n_chart"])
+    rows = []
+    for _, g in df.groupby(["country", "date"], sort=False):
+        n_chart = g["n_chart"].dropna()
+        rows.append(summarize_frame(g, int(n_chart.iloc[0]) if len(n_chart) else np.nan))
+    return rows
+
 def main():
+    ap = argparse.ArgumentParser(description="Summarize every processed file into one row per country/date and build the mood cube.")
+    ap.add_argument("--dataset", default=DATASET_PATH, help="Partitioned processed dataset (from process_data.py)")
+    ap.add_argument("--pattern", default=IN_PATTERN, help="Glob of processed CSVs, used if --dataset does not exist")
+    ap.add_argument("--country", action="append", help="Only these countries (repeatable; dataset only)")
+    ap.add_argument("--start", help="First date YYYY-MM-DD (dataset only)")
+    ap.add_argument("--end", help="Last date YYYY-MM-DD (dataset only)")
+    ap.add_argument("--out", help=f"Summary CSV (default: {OUT_PATH}; required with --country/--start/--end)")
+    ap.add_argument("--cube", help=f"Precomputed cube (.npz) for the visualizers (default: {CUBE_PATH}; "
+                                   "with --country/--start/--end only if given)")
+    args = ap.parse_args()
+
+    # Un resumen filtrado es parcial: no debe sustituir al resumen ni al cubo completos
+    # que leen serve.py y los visualizadores
+    filtered = bool(args.country or args.start or args.end)
+    if filtered and not args.out:
+        ap.error("--country/--start/--end give a partial summary; pass an explicit --out (and --cube for its cube)")
+    out_path = args.out or OUT_PATH
+    cube_path = args.cube or (None if filtered else CUBE_PATH)
+
     rows = []
-    for path in glob.glob(IN_PATTERN):
-        row = summarize_file(path)
-        if row is not None:
-            rows.append(row)
+    if mood_dataset.exists(args.dataset):
+        rows = summarize_dataset(args.dataset, args.country, args.start, args.end)
+    else:
+        for path in glob.glob(args.pattern):
+            row = summarize_file(path)
+            if row is not None:
+                rows.append(row)
 
     if not rows:
         print("⚠️ No processed files found.")
         return
 
     out = pd.DataFrame(rows).sort_values(["date", "country"]).reset_index(drop=True)
-    Path(OUT_PATH).parent.mkdir(parents=True, exist_ok=True)
-    out.to_csv(OUT_PATH, index=False)
-    print(f"✅ Saved summary: {OUT_PATH} ({len(out)} rows)")
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    out.to_csv(out_path, index=False)
+    print(f"✅ Saved summary: {out_path} ({len(out)} rows)")
+
+    # Cubo precalculado (país × día/semana/mes) para consultas rápidas desde los visualizadores
+    if cube_path:
+        Path(cube_path).parent.mkdir(parents=True, exist_ok=True)
+        np.savez(cube_path, **build_cube(out))
+        print(f"✅ Saved cube: {cube_path}")
 
 if __name__ == "__main__":
     main()
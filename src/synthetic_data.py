@@ -0,0 +1,305 @@
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import mood_dataset
+
+# Cambiar si cambia la forma de los datos generados (invalida las cachés de bench_suite.py)
+GENERATOR_VERSION = 2
+
+ALPHABET = np.array(list("0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"))
+
+# Vocabulario con acentos y caracteres no ASCII para que norm_text tenga trabajo real
+WORDS = [
+    "love", "night", "summer", "heart", "fire", "dance", "dream", "rain", "gold", "wild",
+    "corazón", "canción", "mañana", "noche", "fuego", "bailando", "café", "niña", "amor", "vida",
+    "über", "straße", "liebe", "été", "cœur", "soleil", "coração", "saudade", "até", "você",
+    "tokyo", "neon", "midnight", "shadow", "ocean", "sky", "crazy", "blue", "river", "home",
+]
+FIRST = ["Luis", "Ana", "DJ", "Lil", "The", "Los", "Mc", "Young", "Big", "Sofía", "José", "Zoë", "Björn", "Chloé", "Kenji"]
+LAST = ["Fonsi", "Ramos", "Snake", "Pump", "Weeknd", "Bravos", "Kevin", "Thug", "Sean", "Reyes", "Müller", "Åberg", "Beaumont", "Tanaka", "Costa"]
+
+# Variantes de edición típicas entre charts, API y el dataset público
+TITLE_SUFFIXES = [
+    " (feat. {other})", " - Remastered 2011", " - Radio Edit", " (Live)", " - Acoustic",
+    " [Remix]", " (Sped Up)", " - Single Version", " (Mono)",
+]
+
+REGIONS = [
+    "global", "us", "gb", "es", "fr", "de", "it", "br", "mx", "ar", "jp", "au", "ca", "nl", "se",
+    "no", "dk", "fi", "pl", "pt", "be", "at", "ch", "ie", "nz", "cl", "co", "pe", "ec", "uy",
+    "py", "bo", "cr", "gt", "hn", "sv", "pa", "do", "ph", "id", "my", "sg", "tw", "hk", "tr",
+    "gr", "cz", "sk", "hu", "lt", "lv", "ee", "is", "lu",
+]
+
+SEASON_DATES = ["2017-08-01", "2018-01-05"]
+
+
+def make_ids(rng: np.random.Generator, n: int) -> np.ndarray:
+    """IDs de 22 caracteres base62, como los de Spotify."""
+    return ALPHABET[rng.integers(0, len(ALPHABET), size=(n, 22))].view("<U22").ravel()
+
+
+def make_artists(rng: np.random.Generator, n: int) -> list[str]:
+    first = rng.integers(0, len(FIRST), n)
+    last = rng.integers(0, len(LAST), n)
+    names = [f"{FIRST[f]} {LAST[l]} {i}" for i, (f, l) in enumerate(zip(first, last))]
+    # algunos dúos "A & B" / "A x B"
+    for i in np.flatnonzero(rng.random(n) < 0.05):
+        names[i] = f"{names[i]} {'&' if i % 2 else 'x'} {names[(i * 7 + 1) % n]}"
+    return names
+
+
+def make_titles(rng: np.random.Generator, n: int) -> list[str]:
+    k = rng.integers(1, 4, n)
+    w = rng.integers(0, len(WORDS), (n, 3))
+    # el índice hace únicos los títulos (como mucho hay homónimos entre artistas, no duplicados exactos)
+    return [" ".join(WORDS[j] for j in w[i, :k[i]]).title() + f" {i}" for i in range(n)]
+
+
+def name_variant(rng: np.random.Generator, title: str, other_artist: str) -> str:
+    """Variante de un título que norm_text debe llevar a la misma clave."""
+    r = rng.random()
+    if r < 0.6:
+        return title + TITLE_SUFFIXES[int(rng.integers(len(TITLE_SUFFIXES)))].format(other=other_artist)
+    if r < 0.8:
+        return title.upper()
+    return "  " + title.replace(" ", "  ") + " "
+
+
+def make_catalog(n_tracks: int, seed: int = 0, dup_frac: float = 0.05) -> pd.DataFrame:
+    """
+    Tabla de audio features con las columnas de load_public_data.py.
+    Una fracción dup_frac son reediciones: otro track_id con el título en una variante.
+    """
+    rng = np.random.default_rng(seed)
+    n_base = int(n_tracks * (1 - dup_frac))
+    artists = make_artists(rng, max(1, n_base // 8))
+    df = pd.DataFrame({
+        "track_id": make_ids(rng, n_base),
+        "track_name": make_titles(rng, n_base),
+        "artist_name": np.asarray(artists, dtype=object)[rng.integers(0, len(artists), n_base)],
+    })
+    dup = df.iloc[rng.integers(0, n_base, n_tracks - n_base)].copy()
+    dup["track_id"] = make_ids(rng, len(dup))
+    dup["track_name"] = [name_variant(rng, t, a) for t, a in zip(dup["track_name"], dup["artist_name"])]
+    df = pd.concat([df, dup], ignore_index=True)
+
+    n = len(df)
+    df["popularity"] = rng.integers(0, 101, n)
+    df["danceability"] = rng.beta(5, 3, n).round(3)
+    df["energy"] = rng.beta(5, 3, n).round(3)
+    df["valence"] = rng.beta(3, 3, n).round(3)
+    df["tempo"] = rng.normal(120, 25, n).clip(60, 200).round(3)
+    return df
+
+
+def make_charts(catalog: pd.DataFrame, n_regions: int, n_days: int, top: int = 200,
+                start: str = "2017-01-01", seed: int = 0, variant_frac: float = 0.1) -> pd.DataFrame:
+    """
+    Charts diarios con el formato del Worldwide Daily Song Ranking (Kaggle):
+    n_regions × n_days × top filas. Las canciones siguen una ley de Zipf sobre el catálogo,
+    una fracción de títulos aparece como variante y ~1% de filas no trae URL.
+    """
+    rng = np.random.default_rng(seed + 1)
+    n_rows = n_regions * n_days * top
+    regions = REGIONS[:n_regions] + [f"x{i}" for i in range(max(0, n_regions - len(REGIONS)))]
+    dates = pd.date_range(start, periods=n_days, freq="D").strftime("%Y-%m-%d").to_numpy()
+
+    weights = 1.0 / np.arange(1, len(catalog) + 1) ** 0.9
+    pick = rng.choice(len(catalog), size=n_rows, p=weights / weights.sum())
+
+    names = catalog["track_name"].to_numpy(dtype=object).copy()
+    for i in np.flatnonzero(rng.random(len(names)) < variant_frac):
+        names[i] = name_variant(rng, names[i], "Guest")
+
+    pos = np.tile(np.arange(1, top + 1), n_regions * n_days)
+    urls = "https://open.spotify.com/track/" + catalog["track_id"].to_numpy(dtype=object)[pick]
+    urls[rng.random(n_rows) < 0.01] = None
+    return pd.DataFrame({
+        "Position": pos,
+        "Track Name": names[pick],
+        "Artist": catalog["artist_name"].to_numpy(dtype=object)[pick],
+        "Streams": (2_000_000 * pos ** -0.8 * rng.lognormal(0, 0.3, n_rows)).astype(np.int64),
+        "URL": urls,
+        "Date": np.repeat(np.tile(dates, n_regions), top),
+        "Region": np.repeat(regions, n_days * top),
+    })
+
+
+def make_metadata(catalog: pd.DataFrame, n_rows: int, seed: int = 0,
+                  relinked_frac: float = 0.2, unknown_frac: float = 0.05,
+                  country: str = "Spain", date: str = "2017-08-01") -> pd.DataFrame:
+    """
+    Metadatos con las columnas de fetch_metadata.py. relinked_frac de las filas trae otro
+    track_id (edición regional) y el título en variante, así que sólo casan por nombre;
+    unknown_frac no están en el catálogo.
+    """
+    rng = np.random.default_rng(seed + 2)
+    src = catalog.iloc[rng.integers(0, len(catalog), n_rows)].reset_index(drop=True)
+    df = pd.DataFrame({
+        "track_id": src["track_id"].to_numpy(dtype=object),
+        "artist_id": make_ids(rng, n_rows),
+        "track_name": src["track_name"].to_numpy(dtype=object),
+        "artist_name": src["artist_name"].to_numpy(dtype=object),
+        "album_name": "Album",
+        "album_release_date": "2017-01-01",
+        "track_popularity": src["popularity"].to_numpy(),
+        "artist_popularity": rng.integers(0, 101, n_rows),
+        "artist_followers": rng.integers(0, 10_000_000, n_rows),
+        "artist_genres": np.asarray(["pop; dance pop", "latin; reggaeton", "rock", "hip hop; trap", ""], dtype=object)[rng.integers(0, 5, n_rows)],
+        "country": country,
+        "date": date,
+        "streams_chart": rng.integers(10_000, 2_000_000, n_rows),
+    })
+    r = rng.random(n_rows)
+    relinked = np.flatnonzero(r < relinked_frac)
+    df.loc[relinked, "track_id"] = make_ids(rng, len(relinked))
+    df.loc[relinked, "track_name"] = [name_variant(rng, t, "Guest") for t in df.loc[relinked, "track_name"]]
+    unknown = np.flatnonzero((r >= relinked_frac) & (r < relinked_frac + unknown_frac))
+    df.loc[unknown, "track_id"] = make_ids(rng, len(unknown))
+    df.loc[unknown, "track_name"] = [f"Unreleased {i}" for i in unknown]
+    return df
+
+
+def processed_from(meta: pd.DataFrame, catalog: pd.DataFrame, seed: int = 0) -> pd.DataFrame:
+    """Filas con el formato de salida de process_data.py (sin hacer el merge real)."""
+    rng = np.random.default_rng(seed + 3)
+    f = catalog.iloc[rng.integers(0, len(catalog), len(meta))].reset_index(drop=True)
+    df = meta[["track_name", "artist_name", "country", "date"]].reset_index(drop=True)
+    for col in ["valence", "energy", "danceability", "tempo"]:
+        df[col] = f[col]
+    df["mood_index"] = (df["valence"] + df["energy"]) / 2
+    for col in ["track_popularity", "artist_popularity", "artist_genres", "streams_chart"]:
+        df[col] = meta[col].to_numpy()
+    return df
+
+
+def country_codes(n: int) -> list[str]:
+    codes = [r.upper() for r in REGIONS if len(r) == 2]
+    extra = [a + b for a in "QWXZ" for b in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"]
+    return (codes + extra)[:n]
+
+
+def make_summary(n_countries: int, dates: list[str] = SEASON_DATES, seed: int = 0) -> pd.DataFrame:
+    """country_summary.csv como el de summarize.py (por defecto con las dos fechas estacionales)."""
+    rng = np.random.default_rng(seed + 4)
+    rows = []
+    for date in dates:
+        for cc in country_codes(n_countries):
+            m = rng.normal(0.6, 0.05, 5).clip(0, 1)
+            n_chart = 50
+            n_matched = int(rng.integers(30, 51))
+            rows.append({
+                "country": cc, "date": date, "n_chart": n_chart, "n_matched": n_matched,
+                "match_rate": n_matched / n_chart, "mean": m[0], "median": m[1],
+                "p25": m[1] - 0.08, "p75": m[1] + 0.08, "w_mean_pop": m[3], "w_mean_streams": m[4],
+            })
+    return pd.DataFrame(rows)
+
+
+def write_tree(root: str, n_tracks: int, n_regions: int, n_days: int, top: int,
+               meta_rows: int, n_files: int, file_rows: int, n_countries: int, seed: int = 0) -> dict:
+    """
+    Genera un árbol data/ completo bajo `root` y devuelve su manifiesto (rutas relativas a root):
+      data/interim/audio_features_clean.csv       catálogo
+      data/raw/worldwide_daily_song_ranking.csv   charts
+      data/interim/XX_metadata_synth.csv          metadatos para process_data.py
+      data/processed/{CC}_mood_{date}.csv         + data/interim/{CC}_metadata_{date}.csv (summarize.py)
+      data/processed/mood_dataset/                las mismas filas en el dataset Parquet (country/date)
+      data/processed/country_summary.csv          resumen para los visualizadores
+    """
+    root_p = Path(root)
+    for d in ["data/raw", "data/interim", "data/processed"]:
+        (root_p / d).mkdir(parents=True, exist_ok=True)
+    paths = {
+        "features": "data/interim/audio_features_clean.csv",
+        "charts": "data/raw/worldwide_daily_song_ranking.csv",
+        "metadata": "data/interim/XX_metadata_synth.csv",
+        "summary": "data/processed/country_summary.csv",
+        "dataset": "data/processed/mood_dataset",
+        "processed_a": None,
+        "processed_b": None,
+    }
+
+    catalog = make_catalog(n_tracks, seed)
+    catalog.to_csv(root_p / paths["features"], index=False)
+    print(f"🎲 Catalog: {len(catalog):,} tracks")
+
+    charts = make_charts(catalog, n_regions, n_days, top, seed=seed)
+    charts.to_csv(root_p / paths["charts"], index=False)
+    print(f"🎲 Charts: {len(charts):,} rows ({n_regions} regions × {n_days} days × top {top})")
+    del charts
+
+    make_metadata(catalog, meta_rows, seed).to_csv(root_p / paths["metadata"], index=False)
+    print(f"🎲 Metadata: {meta_rows:,} rows")
+
+    codes = country_codes(max(1, -(-n_files // len(SEASON_DATES))))
+    written = 0
+    meta_files, frames = [], []
+    for i, (cc, date) in enumerate((cc, d) for d in SEASON_DATES for cc in codes):
+        if written >= n_files:
+            break
+        meta = make_metadata(catalog, file_rows, seed + 10 + i, country=cc, date=date)
+        proc = processed_from(meta, catalog, seed + 10 + i)
+        proc = proc[~meta["track_name"].str.startswith("Unreleased")].reset_index(drop=True)
+        meta_path = f"data/interim/{cc}_metadata_{date}.csv"
+        meta.to_csv(root_p / meta_path, index=False)
+        meta_files.append(meta_path)
+        out = f"data/processed/{cc}_mood_{date}.csv"
+        proc.to_csv(root_p / out, index=False)
+        frames.append(proc.assign(n_chart=len(meta)))
+        if i < 2:
+            paths["processed_b" if i else "processed_a"] = out
+        written += 1
+    print(f"🎲 Processed: {written} files × ~{file_rows} rows")
+    dataset_rows = sum(len(f) for f in frames)
+    if frames:
+        mood_dataset.write(pd.concat(frames, ignore_index=True), str(root_p / paths["dataset"]))
+    del frames
+    print(f"🎲 Dataset: {dataset_rows:,} rows in {written} partitions")
+
+    make_summary(n_countries, seed=seed).to_csv(root_p / paths["summary"], index=False)
+    print(f"🎲 Summary: {n_countries} countries × {len(SEASON_DATES)} dates")
+
+    manifest = {
+        "generator_version": GENERATOR_VERSION,
+        "params": dict(n_tracks=n_tracks, n_regions=n_regions, n_days=n_days, top=top, meta_rows=meta_rows,
+                       n_files=n_files, file_rows=file_rows, n_countries=n_countries, seed=seed),
+        "rows": {"features": len(catalog), "charts": n_regions * n_days * top, "metadata": meta_rows,
+                 "processed_files": written, "meta_files": file_rows * written, "dataset": dataset_rows,
+                 "summary": n_countries * len(SEASON_DATES)},
+        "paths": paths,
+        "meta_files": meta_files,
+        "pick": {"country": "ES", "date": str((pd.Timestamp("2017-01-01") + pd.Timedelta(days=n_days // 2)).date())},
+    }
+    with open(root_p / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Write a deterministic synthetic data/ tree (charts, audio features, metadata, processed files "
+                                             "and dataset, summary).")
+    ap.add_argument("--out-dir", required=True, help="Root directory for the synthetic data/ tree")
+    ap.add_argument("--tracks", type=int, default=100_000, help="Audio-feature catalog size")
+    ap.add_argument("--regions", type=int, default=50)
+    ap.add_argument("--days", type=int, default=100)
+    ap.add_argument("--top", type=int, default=200, help="Chart rows per region and day")
+    ap.add_argument("--meta-rows", type=int, default=20_000, help="Rows in the metadata file for process_data.py")
+    ap.add_argument("--files", type=int, default=200, help="Processed files for summarize.py")
+    ap.add_argument("--file-rows", type=int, default=50, help="Rows per processed file")
+    ap.add_argument("--countries", type=int, default=60, help="Countries in the summary for the visualizers")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    m = write_tree(args.out_dir, args.tracks, args.regions, args.days, args.top, args.meta_rows,
+                   args.files, args.file_rows, args.countries, args.seed)
+    print(f"✅ Synthetic tree in {args.out_dir}: {m['rows']}")
+
+
+if __name__ == "__main__":
+    main()
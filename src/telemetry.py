@@ -0,0 +1,202 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+from urllib3.util.retry import Retry
+
+TELEMETRY_DIR = "data/reports/telemetry"
+
+# Cubos del histograma de latencia (segundos), estilo Prometheus
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+INSTRUMENTED = ("search", "track", "tracks", "artist", "artists")
+
+
+def _percentile(sorted_xs: list[float], q: float) -> float | None:
+    if not sorted_xs:
+        return None
+    i = min(len(sorted_xs) - 1, max(0, int(round(q / 100 * (len(sorted_xs) - 1)))))
+    return sorted_xs[i]
+
+
+class Telemetry:
+    """
+    Contadores e histogramas de las llamadas a la API de Spotify de una tarea:
+    llamadas y latencia por endpoint, errores (SpotifyException) por endpoint y código,
+    respuestas 429, reintentos, tiempo total de espera (backoff / Retry-After)
+    y filas descartadas. Coste por llamada: un perf_counter y unos pocos appends.
+    """
+
+    def __init__(self, **labels):
+        self.labels = labels
+        self._lock = threading.Lock()
+        self.calls: dict[str, int] = {}
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[tuple[str, int], int] = {}
+        self.throttled = 0
+        self.retries = 0
+        self.backoff_s = 0.0
+        self.rows_dropped = 0
+
+    def record_call(self, endpoint: str, seconds: float, status: int | None = None):
+        with self._lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            self.latencies.setdefault(endpoint, []).append(seconds)
+            if status is not None:
+                self.errors[(endpoint, status)] = self.errors.get((endpoint, status), 0) + 1
+
+    def record_attempt_failure(self, status: int | None, retried: bool):
+        with self._lock:
+            if status == 429:
+                self.throttled += 1
+            if retried:
+                self.retries += 1
+
+    def record_backoff(self, seconds: float):
+        with self._lock:
+            self.backoff_s += seconds
+
+    def record_dropped_row(self):
+        with self._lock:
+            self.rows_dropped += 1
+
+    def wrap(self, sp):
+        return InstrumentedSpotify(sp, self)
+
+    def summary(self) -> dict:
+        with self._lock:
+            endpoints = {}
+            for ep, lat in self.latencies.items():
+                xs = sorted(lat)
+                endpoints[ep] = {
+                    "calls": self.calls[ep],
+                    "p50_ms": round(_percentile(xs, 50) * 1000, 2),
+                    "p95_ms": round(_percentile(xs, 95) * 1000, 2),
+                    "p99_ms": round(_percentile(xs, 99) * 1000, 2),
+                    "max_ms": round(xs[-1] * 1000, 2),
+                    "total_s": round(sum(xs), 4),
+                }
+            return {
+                "labels": self.labels,
+                "endpoints": endpoints,
+                "errors": [{"endpoint": ep, "status": st, "count": n} for (ep, st), n in sorted(self.errors.items())],
+                "throttled_429": self.throttled,
+                "retries": self.retries,
+                "backoff_s": round(self.backoff_s, 3),
+                "rows_dropped": self.rows_dropped,
+            }
+
+    def to_prometheus(self) -> str:
+        """Formato de texto de Prometheus (p.ej. para el textfile collector de node_exporter)."""
+        base = ",".join(f'{k}="{v}"' for k, v in self.labels.items())
+
+        def lbl(**extra) -> str:
+            parts = [base] if base else []
+            parts += [f'{k}="{v}"' for k, v in extra.items()]
+            return "{" + ",".join(parts) + "}" if parts else ""
+
+        with self._lock:
+            out = [
+                "# HELP spotify_api_calls_total Spotify API calls by endpoint.",
+                "# TYPE spotify_api_calls_total counter",
+                *[f"spotify_api_calls_total{lbl(endpoint=ep)} {n}" for ep, n in sorted(self.calls.items())],
+                "# HELP spotify_api_latency_seconds Spotify API call latency (including retries).",
+                "# TYPE spotify_api_latency_seconds histogram",
+            ]
+            for ep, lat in sorted(self.latencies.items()):
+                for le in LATENCY_BUCKETS:
+                    out.append(f'spotify_api_latency_seconds_bucket{lbl(endpoint=ep, le=le)} {sum(x <= le for x in lat)}')
+                out.append(f'spotify_api_latency_seconds_bucket{lbl(endpoint=ep, le="+Inf")} {len(lat)}')
+                out.append(f"spotify_api_latency_seconds_sum{lbl(endpoint=ep)} {sum(lat):.6f}")
+                out.append(f"spotify_api_latency_seconds_count{lbl(endpoint=ep)} {len(lat)}")
+            out += [
+                "# HELP spotify_api_errors_total Calls that raised SpotifyException, by endpoint and status.",
+                "# TYPE spotify_api_errors_total counter",
+                *[f"spotify_api_errors_total{lbl(endpoint=ep, status=st)} {n}" for (ep, st), n in sorted(self.errors.items())],
+                "# HELP spotify_api_throttled_total HTTP 429 responses received.",
+                "# TYPE spotify_api_throttled_total counter",
+                f"spotify_api_throttled_total{lbl()} {self.throttled}",
+                "# HELP spotify_api_retries_total HTTP attempts retried (429/5xx/connection errors).",
+                "# TYPE spotify_api_retries_total counter",
+                f"spotify_api_retries_total{lbl()} {self.retries}",
+                "# HELP spotify_api_backoff_seconds_total Time spent waiting between retries.",
+                "# TYPE spotify_api_backoff_seconds_total counter",
+                f"spotify_api_backoff_seconds_total{lbl()} {self.backoff_s:.3f}",
+                "# HELP spotify_rows_dropped_total Chart rows dropped because of SpotifyException.",
+                "# TYPE spotify_rows_dropped_total counter",
+                f"spotify_rows_dropped_total{lbl()} {self.rows_dropped}",
+            ]
+        return "\n".join(out) + "\n"
+
+    def export(self, path: str) -> str:
+        """Escribe JSON, o texto Prometheus si la ruta termina en .prom."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            if path.endswith(".prom"):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.summary(), f, indent=2)
+        return path
+
+
+class TelemetryRetry(Retry):
+    """
+    Retry de urllib3 que informa a Telemetry de cada intento fallido (429/5xx/errores
+    de conexión) y del tiempo dormido entre intentos (backoff o Retry-After).
+    """
+
+    def __init__(self, *args, telemetry: Telemetry | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.telemetry = telemetry
+
+    def new(self, **kw):
+        r = super().new(**kw)
+        r.telemetry = self.telemetry
+        return r
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        status = response.status if response is not None else None
+        try:
+            r = super().increment(method, url, response, error, _pool, _stacktrace)
+        except Exception:
+            if self.telemetry:
+                self.telemetry.record_attempt_failure(status, retried=False)
+            raise
+        if self.telemetry:
+            self.telemetry.record_attempt_failure(status, retried=True)
+        return r
+
+    def sleep(self, response=None):
+        t0 = time.perf_counter()
+        super().sleep(response)
+        if self.telemetry:
+            self.telemetry.record_backoff(time.perf_counter() - t0)
+
+
+class InstrumentedSpotify:
+    """
+    Envoltorio de spotipy.Spotify que mide search/track/tracks/artist/artists;
+    el resto de atributos se delegan sin cambios.
+    """
+
+    def __init__(self, sp, telemetry: Telemetry):
+        self._sp = sp
+        self.telemetry = telemetry
+
+    def __getattr__(self, name):
+        attr = getattr(self._sp, name)
+        if name not in INSTRUMENTED:
+            return attr
+
+        def timed(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                result = attr(*args, **kwargs)
+            except Exception as e:
+                self.telemetry.record_call(name, time.perf_counter() - t0, status=getattr(e, "http_status", -1))
+                raise
+            self.telemetry.record_call(name, time.perf_counter() - t0)
+            return result
+
+        return timed
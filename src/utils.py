@@ -1,16 +1,178 @@
+import json
 import os
+import tempfile
+import time
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
+import requests
 import spotipy
-from spotipy.oauth2 import SpotifyOAuth
+from requests.adapters import HTTPAdapter
+from spotipy.cache_handler import CacheHandler
+from spotipy.oauth2 import SpotifyClientCredentials, SpotifyOAuth
 
+from telemetry import Telemetry, TelemetryRetry
 
-def get_spotify_client() -> spotipy.Spotify:
+# Token cache shared by every process of a run (multi_country_run launches one per stage)
+TOKEN_CACHE_PATH = ".cache-client-credentials"
+
+
+class SharedTokenCache(CacheHandler):
+    """
+    Client-credentials token cache on disk, shared across processes.
+    The token is kept in memory and the file is only re-read once the in-memory
+    copy is about to expire. Writes are atomic (temp file + os.replace).
+    """
+
+    def __init__(self, path: str = TOKEN_CACHE_PATH):
+        self.path = path
+        self._token = None
+
+    def get_cached_token(self):
+        if self._token and self._token.get("expires_at", 0) - time.time() > 60:
+            return self._token
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self._token = json.load(f)
+        except (OSError, ValueError):
+            self._token = None
+        return self._token
+
+    def save_token_to_cache(self, token_info):
+        self._token = token_info
+        d = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=d, prefix=".token-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(token_info, f)
+        os.replace(tmp, self.path)
+
+
+@contextmanager
+def _file_lock(path: str, timeout: float = 30.0):
+    # Portable lock (works on Windows too): exclusive creation of a lock file.
+    # A lock older than `timeout` is considered abandoned.
+    deadline = time.time() + timeout
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) > timeout:
+                    os.remove(path)
+                    continue
+            except OSError:
+                continue
+            if time.time() > deadline:
+                raise TimeoutError(f"Could not acquire lock {path}")
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class SharedClientCredentials(SpotifyClientCredentials):
+    """
+    Client Credentials flow whose token refresh is serialized across processes:
+    only one process requests a new token, the rest pick it up from the shared cache.
+    """
+
+    def get_access_token(self, as_dict=True, check_cache=True):
+        token_info = self.cache_handler.get_cached_token()
+        if check_cache and token_info and not self.is_token_expired(token_info):
+            return token_info if as_dict else token_info["access_token"]
+        with _file_lock(self.cache_handler.path + ".lock"):
+            # another process may have refreshed it while we waited for the lock
+            return super().get_access_token(as_dict=as_dict, check_cache=check_cache)
+
+
+def make_pooled_session(pool_size: int = 16, retries: int = 3, backoff_factor: float = 0.3,
+                        telemetry: Telemetry | None = None) -> requests.Session:
+    """
+    Keep-alive HTTP session with a connection pool sized for concurrent fetching.
+    Retry policy mirrors spotipy's default (429/5xx, honouring Retry-After).
+    With telemetry, every retried attempt, 429 and backoff wait is recorded.
+    """
+    session = requests.Session()
+    retry = TelemetryRetry(
+        total=retries,
+        connect=None,
+        read=False,
+        allowed_methods=frozenset(["GET", "POST", "PUT", "DELETE"]),
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        telemetry=telemetry,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_offline_client(api_base: str, **kwargs) -> spotipy.Spotify:
+    """
+    Create a Spotify client pointed at a local stand-in of the Web API
+    (see mock_spotify.py). Uses a static token, so no login is needed.
+    Extra kwargs are passed to spotipy.Spotify (retries, backoff_factor, ...).
+    """
+    sp = spotipy.Spotify(auth="mock-token", **kwargs)
+    sp.prefix = api_base.rstrip("/") + "/v1/"
+    return sp
+
+
+def get_headless_client(pool_size: int = 16, token_cache: str = TOKEN_CACHE_PATH,
+                        telemetry: Telemetry | None = None) -> spotipy.Spotify:
+    """
+    Create a Spotify client using Client Credentials Flow (no browser, no user scopes),
+    which is all search/track/artist need. The token is cached on disk and reused by
+    every process until it expires, and requests go through a pooled keep-alive session.
+    If SPOTIFY_API_BASE is set, the client talks to that local stand-in instead.
+    With telemetry, API calls are timed and counted (see telemetry.py).
+    """
+    load_dotenv()
+    session = make_pooled_session(pool_size, telemetry=telemetry)
+    api_base = os.getenv("SPOTIFY_API_BASE")
+    if api_base:
+        sp = get_offline_client(api_base, requests_session=session)
+        return telemetry.wrap(sp) if telemetry else sp
+
+    cid = os.getenv("SPOTIPY_CLIENT_ID")
+    secret = os.getenv("SPOTIPY_CLIENT_SECRET")
+    if not cid or not secret:
+        raise RuntimeError("Missing Spotify credentials in .env file")
+
+    auth_manager = SharedClientCredentials(
+        client_id=cid,
+        client_secret=secret,
+        requests_session=session,
+        cache_handler=SharedTokenCache(token_cache),
+    )
+    sp = spotipy.Spotify(auth_manager=auth_manager, requests_session=session)
+    return telemetry.wrap(sp) if telemetry else sp
+
+
+def get_spotify_client(telemetry: Telemetry | None = None) -> spotipy.Spotify:
     """
     Create and return a Spotify client using Authorization Code Flow.
     This requires a one-time login in the browser.
+    If SPOTIFY_API_BASE is set (e.g. http://127.0.0.1:8900), the client talks
+    to that local stand-in instead and no credentials are required.
+    With telemetry, requests go through an instrumented pooled session, so
+    throttling, retries and backoff are recorded as in get_headless_client.
     """
     load_dotenv()
+    session_kwargs = {"requests_session": make_pooled_session(telemetry=telemetry)} if telemetry else {}
+    api_base = os.getenv("SPOTIFY_API_BASE")
+    if api_base:
+        sp = get_offline_client(api_base, **session_kwargs)
+        return telemetry.wrap(sp) if telemetry else sp
+
     cid = os.getenv("SPOTIPY_CLIENT_ID")
     secret = os.getenv("SPOTIPY_CLIENT_SECRET")
     redirect = os.getenv("SPOTIPY_REDIRECT_URI")
@@ -24,7 +186,9 @@ def get_spotify_client() -> spotipy.Spotify:
         redirect_uri=redirect,
         # For our use case (search, tracks, artists) no special scopes are needed,
         # but we keep a simple read scope.
-        scope="user-read-private"
+        scope="user-read-private",
+        **session_kwargs,
     )
 
-    return spotipy.Spotify(auth_manager=auth_manager)
+    sp = spotipy.Spotify(auth_manager=auth_manager, **session_kwargs)
+    return telemetry.wrap(sp) if telemetry else sp
@@ -2,6 +2,8 @@ import argparse
 import pandas as pd
 import matplotlib.pyplot as plt
 
+import mood_dataset
+
 
 def plot_mood_index_bar(df: pd.DataFrame, out_path: str):
     """
@@ -45,11 +47,19 @@ def plot_valence_vs_energy(df: pd.DataFrame, out_path: str):
 
 def main():
     parser = argparse.ArgumentParser(description="Visualize Mood Index results.")
-    parser.add_argument("--input", required=True, help="Path to processed CSV file (from process_data.py)")
+    parser.add_argument("--country", help="Country to plot from the processed dataset (with --date)")
+    parser.add_argument("--date", help="Date YYYY-MM-DD to plot from the processed dataset (with --country)")
+    parser.add_argument("--dataset", default=mood_dataset.DATASET_PATH, help="Processed dataset (from process_data.py)")
+    parser.add_argument("--input", help="Processed CSV file instead of the dataset")
     parser.add_argument("--outdir", default="figures", help="Directory to save figures")
     args = parser.parse_args()
+    if not args.input and not (args.country and args.date):
+        parser.error("pass --country and --date (processed dataset) or --input (CSV)")
 
-    df = pd.read_csv(args.input)
+    if args.input:
+        df = pd.read_csv(args.input)
+    else:
+        df = mood_dataset.read(args.dataset, countries=[args.country], dates=[args.date])
     if df.empty:
         print("⚠️ Empty dataset. Nothing to plot.")
         return
@@ -1,21 +1,30 @@
 import argparse
+import os
 import pandas as pd
 import matplotlib.pyplot as plt
 
-def load_tagged(path: str, tag: str) -> pd.DataFrame:
-    df = pd.read_csv(path)
+import mood_dataset
+
+def load_tagged(spec: str, tag: str, dataset: str = mood_dataset.DATASET_PATH) -> pd.DataFrame:
+    # "Spain@2017-08-01" -> partición del dataset; cualquier otra cosa, un CSV procesado
+    if "@" in spec and not os.path.exists(spec):
+        country, date = spec.rsplit("@", 1)
+        df = mood_dataset.read(dataset, countries=[country], dates=[date])
+    else:
+        df = pd.read_csv(spec)
     df["tag"] = tag
     return df
 
 def main():
-    ap = argparse.ArgumentParser(description="Compare two processed CSVs (e.g., summer vs winter).")
-    ap.add_argument("--a", required=True, help="CSV A (processed, with mood_index)")
-    ap.add_argument("--b", required=True, help="CSV B (processed, with mood_index)")
+    ap = argparse.ArgumentParser(description="Compare two processed sets (e.g., summer vs winter).")
+    ap.add_argument("--a", required=True, help="Set A: COUNTRY@YYYY-MM-DD from the processed dataset, or a processed CSV")
+    ap.add_argument("--b", required=True, help="Set B: COUNTRY@YYYY-MM-DD from the processed dataset, or a processed CSV")
+    ap.add_argument("--dataset", default=mood_dataset.DATASET_PATH, help="Processed dataset (from process_data.py)")
     ap.add_argument("--outdir", default="figures", help="Output directory")
     args = ap.parse_args()
 
-    a = load_tagged(args.a, "A")
-    b = load_tagged(args.b, "B")
+    a = load_tagged(args.a, "A", args.dataset)
+    b = load_tagged(args.b, "B", args.dataset)
     df = pd.concat([a, b], ignore_index=True)
 
     # 1) Boxplot MoodIndex por tag
@@ -30,13 +30,25 @@ def main():
     ap = argparse.ArgumentParser(description="Multi-country visualizations (English)")
     ap.add_argument("--summary", default="data/processed/country_summary.csv")
     ap.add_argument("--outdir", default="figures")
+    ap.add_argument("--cube", help="Precomputed cube (from mood_cube.py). Default: data/processed/mood_cube.npz, "
+                                   "only with the default --summary and if not older than it")
     args = ap.parse_args()
 
     os.makedirs(args.outdir, exist_ok=True)
-    df = pd.read_csv(args.summary)
 
-    for date in sorted(df["date"].unique()):
-        d = df[df["date"] == date].copy()
+    from mood_cube import MoodCube, resolve_cube
+    cube_path = resolve_cube(args.cube, args.summary)
+    if cube_path:
+        cube = MoodCube.load(cube_path)
+        dates = cube.dates()
+        get_day = lambda date: cube.snapshot(date, metrics=["mean", "w_mean_streams", "match_rate"])
+    else:
+        df = pd.read_csv(args.summary)
+        dates = sorted(df["date"].unique())
+        get_day = lambda date: df[df["date"] == date].copy()
+
+    for date in dates:
+        d = get_day(date)
 
         # 1) Simple Mean
         out1 = os.path.join(args.outdir, f"mood_by_country_mean_{date}.png")
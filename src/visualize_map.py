@@ -48,12 +48,19 @@ def main():
     ap.add_argument("--date", required=True, help="Date YYYY-MM-DD")
     ap.add_argument("--metric", default="w_mean_streams", choices=["mean", "w_mean_streams"])
     ap.add_argument("--outdir", default="figures")
+    ap.add_argument("--cube", help="Precomputed cube (from mood_cube.py). Default: data/processed/mood_cube.npz, "
+                                   "only with the default --summary and if not older than it")
     args = ap.parse_args()
 
     os.makedirs(args.outdir, exist_ok=True)
 
-    df = pd.read_csv(args.summary)
-    df = df[df["date"] == args.date].copy()
+    from mood_cube import MoodCube, resolve_cube
+    cube_path = resolve_cube(args.cube, args.summary)
+    if cube_path:
+        df = MoodCube.load(cube_path).snapshot(args.date, metrics=[args.metric])
+    else:
+        df = pd.read_csv(args.summary)
+        df = df[df["date"] == args.date].copy()
     
     if df.empty:
         print(f"⚠️ No data found for date {args.date}")
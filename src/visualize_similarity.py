@@ -0,0 +1,54 @@
+import argparse
+import glob
+import os
+import pandas as pd
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+TITLES = {
+    "similarity_jaccard": ("Shared Hits Between Countries (Jaccard)", "Jaccard similarity (0-1)"),
+    "similarity_cosine": ("Stream-Weighted Chart Similarity (Cosine)", "Cosine similarity (0-1)"),
+    "mood_correlation": ("Correlation of Daily Mood Series", "Pearson r"),
+}
+
+def plot_heatmap(m: pd.DataFrame, title: str, label: str, out_path: str, center=None):
+    n = len(m)
+    plt.figure(figsize=(max(8, n * 0.25 + 3), max(6, n * 0.25 + 2)))
+    sns.heatmap(m, cmap="RdBu_r" if center is not None else "viridis", center=center,
+                square=True, cbar_kws={"label": label}, xticklabels=True, yticklabels=True)
+    plt.title(title, fontsize=14)
+    plt.xticks(fontsize=8)
+    plt.yticks(fontsize=8)
+    plt.tight_layout()
+    plt.savefig(out_path, dpi=300)
+    plt.close()
+    print(f"✅ Saved: {out_path}")
+
+def main():
+    ap = argparse.ArgumentParser(description="Heatmaps of cross-country chart similarity and mood correlation (English)")
+    ap.add_argument("--indir", default="data/processed", help="Directory with the chart_similarity.py outputs")
+    ap.add_argument("--outdir", default="figures")
+    args = ap.parse_args()
+
+    os.makedirs(args.outdir, exist_ok=True)
+
+    paths = sorted(glob.glob(os.path.join(args.indir, "similarity_*.csv")) +
+                   glob.glob(os.path.join(args.indir, "mood_correlation_*.csv")))
+    if not paths:
+        print("⚠️ No similarity files found. Run chart_similarity.py first.")
+        return
+
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        kind = next(k for k in TITLES if name.startswith(k))
+        tag = name[len(kind) + 1:]
+        m = pd.read_csv(path, index_col=0)
+        if m.dropna(how="all").empty:
+            print(f"⚠️ Skipping {path}: not enough data")
+            continue
+        title, label = TITLES[kind]
+        plot_heatmap(m, f"{title} ({tag})", label, os.path.join(args.outdir, f"{name}.png"),
+                     center=0 if kind == "mood_correlation" else None)
+
+if __name__ == "__main__":
+    main()